@@ -0,0 +1,53 @@
+"""스트림 응답 압축/프레이밍 벤치마크
+
+DEFAULT_JOB_DESCRIPTIONS 를 문자 단위 스트림으로 만들어 인코딩별 전송 바이트와 CPU 시간을 비교한다.
+사용법: python bench_compression.py [반복 횟수]
+"""
+import sys
+import time
+
+from compression import SUPPORTED_ENCODINGS, StreamCompressor, pack_chunk, msgpack
+from models import Chunk, DEFAULT_JOB_DESCRIPTIONS
+
+
+def ndjson_frames():
+    for chunk in DEFAULT_JOB_DESCRIPTIONS:
+        for char in chunk.data:
+            yield (Chunk(type=chunk.type, data=char).model_dump_json() + "\n").encode("utf-8")
+
+
+def msgpack_frames():
+    for chunk in DEFAULT_JOB_DESCRIPTIONS:
+        for char in chunk.data:
+            yield pack_chunk(chunk.type, char)
+
+
+def measure(frames, encoding, repeat):
+    frames = list(frames)
+    total = 0
+    started = time.process_time()
+    for _ in range(repeat):
+        if encoding is None:
+            total = sum(len(frame) for frame in frames)
+            continue
+        compressor = StreamCompressor(encoding)
+        total = sum(len(compressor.compress(frame)) for frame in frames) + len(compressor.finish())
+    elapsed = (time.process_time() - started) / repeat
+    return len(frames), total, elapsed
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    framings = [("ndjson", ndjson_frames)]
+    if msgpack is not None:
+        framings.append(("msgpack", msgpack_frames))
+
+    print(f"{'framing':<10}{'encoding':<10}{'frames':>8}{'bytes':>10}{'cpu(ms)':>10}")
+    for framing, frames in framings:
+        for encoding in [None] + SUPPORTED_ENCODINGS:
+            count, size, elapsed = measure(frames(), encoding, repeat)
+            print(f"{framing:<10}{encoding or 'identity':<10}{count:>8}{size:>10}{elapsed * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
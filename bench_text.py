@@ -0,0 +1,55 @@
+"""텍스트 정리 벤치마크
+
+기존 방식(항목마다 컴파일되지 않은 re.sub)과 normalization 모듈의 단건/일괄 처리를 한국어 코퍼스에서 비교한다.
+사용법: python bench_text.py [문자열 개수]
+"""
+import random
+import re
+import sys
+import time
+import unicodedata
+
+from models import DEFAULT_JOB_DESCRIPTIONS
+from normalization import normalize_text, normalize_texts, sanitize_text
+
+
+def legacy_sanitize_text(text: str) -> str:
+    if not text:
+        return text
+    return re.sub(r'[^\u0000-\uFFFF]', '', text)
+
+
+def build_corpus(size: int, noisy: bool):
+    random.seed(0)
+    sentences = [chunk.data for chunk in DEFAULT_JOB_DESCRIPTIONS]
+    # 깨끗한 코퍼스는 대부분의 실제 입력, 노이즈 코퍼스는 제어 문자/이모지/전각 공백이 섞인 입력
+    noise = ["", "  ", "\u200b", "\u3000", "\U0001F600", "\t", " \r\n "] if noisy else [""]
+    corpus = []
+    for i in range(size):
+        text = " ".join(random.choice(sentences) + random.choice(noise) for _ in range(4))
+        # 일부는 분리된 자모(NFD)로 들어오는 경우를 흉내냄
+        corpus.append(unicodedata.normalize("NFD", text) if noisy and i % 10 == 0 else text)
+    return corpus
+
+
+def measure(name, fn, corpus):
+    started = time.perf_counter()
+    fn(corpus)
+    elapsed = time.perf_counter() - started
+    chars = sum(len(text) for text in corpus)
+    print(f"{name:<28}{elapsed * 1000:>10.1f} ms{chars / elapsed / 1e6:>10.1f} Mchar/s")
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    for noisy in (False, True):
+        corpus = build_corpus(size, noisy)
+        print(f"[{'noisy' if noisy else 'clean'}] {size} strings, {sum(len(text) for text in corpus)} chars")
+        measure("legacy sanitize_text", lambda texts: [legacy_sanitize_text(t) for t in texts], corpus)
+        measure("sanitize_text", lambda texts: [sanitize_text(t) for t in texts], corpus)
+        measure("normalize_text", lambda texts: [normalize_text(t) for t in texts], corpus)
+        measure("normalize_texts (bulk)", normalize_texts, corpus)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import os
+from collections import deque
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 구독자별 버퍼 크기와 버퍼가 가득 찼을 때 정책 (drop: 오래된 프레임 버림, disconnect: 구독 해제)
+SUBSCRIBER_BUFFER_SIZE = int(os.getenv("STREAM_SUBSCRIBER_BUFFER_SIZE", 1024))
+SUBSCRIBER_OVERFLOW_POLICY = os.getenv("STREAM_SUBSCRIBER_OVERFLOW_POLICY", "drop")
+
+
+# 발행이 끝났음을 알리는 SSE 이벤트. EventSource 는 연결이 닫히면 스스로 재접속하므로 클라이언트는 이 이벤트를 받으면 닫아야 함
+SSE_END_EVENT = "event: end\ndata: {}\n\n"
+
+
+class Frame:
+    """한 번만 직렬화된 청크. 전송 방식별 포맷은 처음 요청될 때 한 번 만들어 공유
+
+    id 는 채팅 안에서 1부터 증가하는 순번으로, SSE 재접속 시 Last-Event-ID 로 이어받는 기준이 된다.
+    """
+
+    __slots__ = ("id", "json", "_sse")
+
+    def __init__(self, id: int, json: str):
+        self.id = id
+        self.json = json
+        self._sse: Optional[str] = None
+
+    @property
+    def sse(self) -> str:
+        if self._sse is None:
+            self._sse = f"id: {self.id}\ndata: {self.json}\n\n"
+        return self._sse
+
+
+class Subscriber:
+    def __init__(self, buffer_size: int, policy: str):
+        self.buffer_size = buffer_size
+        self.policy = policy
+        self.buffer: deque = deque()
+        self.dropped = 0
+        self.disconnected = False
+        self.closed = False
+        self._wakeup = asyncio.Event()
+
+    def push(self, frame: Frame):
+        if self.disconnected:
+            return
+        if len(self.buffer) >= self.buffer_size:
+            if self.policy == "disconnect":
+                logger.warning("느린 구독자 버퍼 초과로 연결 해제")
+                self.disconnected = True
+                self._wakeup.set()
+                return
+            self.buffer.popleft()
+            self.dropped += 1
+        self.buffer.append(frame)
+        self._wakeup.set()
+
+    def close(self):
+        self.closed = True
+        self._wakeup.set()
+
+    async def frames(self):
+        """버퍼에 쌓인 프레임을 순서대로 내보냄. 발행이 끝나거나 연결이 끊기면 종료"""
+        while True:
+            while self.buffer and not self.disconnected:
+                yield self.buffer.popleft()
+            if self.closed or self.disconnected:
+                return
+            self._wakeup.clear()
+            await self._wakeup.wait()
+
+
+class ChatBroadcaster:
+    """채팅 하나의 응답 청크를 모든 구독자(채용 담당자, 검토자, 관리자 탭 등)에게 전달
+
+    발행된 프레임은 기록해 두어 늦게 들어온 구독자도 처음부터 (또는 last_event_id 다음부터) 받을 수 있다.
+    """
+
+    def __init__(self, chat_sn: int, buffer_size: int = SUBSCRIBER_BUFFER_SIZE,
+                 policy: str = SUBSCRIBER_OVERFLOW_POLICY):
+        self.chat_sn = chat_sn
+        self.buffer_size = buffer_size
+        self.policy = policy
+        self.history: List[Frame] = []
+        self.subscribers: List[Subscriber] = []
+        self.closed = False
+
+    def publish(self, json: str):
+        frame = Frame(len(self.history) + 1, json)
+        self.history.append(frame)
+        for subscriber in self.subscribers:
+            subscriber.push(frame)
+
+    def close(self):
+        self.closed = True
+        for subscriber in self.subscribers:
+            subscriber.close()
+
+    def subscribe(self, last_event_id: int = 0) -> Subscriber:
+        # 기록 재전송은 버퍼 크기 제한과 무관하게 모두 전달 (재접속이면 이미 받은 프레임은 건너뜀)
+        replay = self.history[max(last_event_id, 0):]
+        subscriber = Subscriber(len(replay) + self.buffer_size, self.policy)
+        subscriber.buffer.extend(replay)
+        if self.closed:
+            subscriber.close()
+        self.subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        if subscriber in self.subscribers:
+            self.subscribers.remove(subscriber)
+        if subscriber.dropped:
+            logger.info(f"chatSn {self.chat_sn} 구독자가 프레임 {subscriber.dropped}개를 놓쳤습니다.")
+
+
+# 진행 중인 채팅별 브로드캐스터
+chat_broadcasters: Dict[int, ChatBroadcaster] = {}
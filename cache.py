@@ -0,0 +1,125 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+CHAT_CACHE_MAX_ENTRIES = int(os.getenv("CHAT_CACHE_MAX_ENTRIES", 1024))
+
+
+class LRUCache:
+    """크기 제한이 있는 LRU 캐시 (스레드 안전, hit/miss/eviction 카운터 포함)"""
+
+    def __init__(self, max_entries: int = CHAT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[int, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: int):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def peek(self, key: int):
+        """카운터와 LRU 순서를 바꾸지 않고 조회"""
+        with self._lock:
+            return self._data.get(key)
+
+    def put(self, key: int, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def append(self, key: int, item) -> bool:
+        """캐시된 리스트에 항목 추가. 캐시에 없으면 False"""
+        with self._lock:
+            if key not in self._data:
+                return False
+            self._data[key].append(item)
+            self._data.move_to_end(key)
+            return True
+
+    def invalidate(self, key: int):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._data), "hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions}
+
+
+class CachedDatabase:
+    """Database 앞단의 chatSn 단위 read-through / write-through 캐시
+
+    save_chat_request 시점에 해당 채팅의 응답 목록을 한 번 읽어 두고,
+    이후 save_chat_response 는 DB 와 캐시에 함께 기록해서 방금 생성된 채팅은 디스크를 읽지 않고 응답한다.
+    캐시에 없는 속성(테이블, 유지보수 메서드 등)은 원본 Database 로 위임한다.
+
+    응답 저장(DB 기록 + 캐시 추가)과 캐시 미스 적재(DB 조회 + 캐시 저장)는 _lock 으로 묶어서
+    적재 중에 저장된 응답이 캐시에 두 번 들어가거나 빠지지 않게 한다.
+    """
+
+    def __init__(self, database, max_entries: int = CHAT_CACHE_MAX_ENTRIES):
+        self._db = database
+        self.responses = LRUCache(max_entries)
+        self.requests = LRUCache(max_entries)
+        self._lock = threading.RLock()
+
+    def __getattr__(self, name):
+        return getattr(self._db, name)
+
+    def save_chat_request(self, chat_request) -> int:
+        chat_sn = self._db.save_chat_request(chat_request)
+        # remove + insert 로 다시 저장되므로 요청 캐시는 무효화하고 응답 목록은 미리 적재
+        self.requests.invalidate(chat_sn)
+        with self._lock:
+            self.responses.put(chat_sn, list(self._db.get_chat_responses(chat_sn)))
+        return chat_sn
+
+    def save_chat_response(self, chat_response) -> int:
+        data = self._db.build_chat_response_row(chat_response)
+        with self._lock:
+            doc_id = self._db.insert_chat_response(data)
+            self.responses.append(chat_response.chatSn, data)
+        return doc_id
+
+    def get_chat_responses(self, chat_sn: int) -> list:
+        cached = self.responses.get(chat_sn)
+        if cached is None:
+            with self._lock:
+                # 잠금을 기다리는 동안 다른 스레드가 적재했을 수 있으므로 다시 확인
+                cached = self.responses.peek(chat_sn)
+                if cached is None:
+                    cached = list(self._db.get_chat_responses(chat_sn))
+                    self.responses.put(chat_sn, cached)
+        return list(cached)
+
+    def get_chat_request(self, chat_sn: int) -> Optional[dict]:
+        cached = self.requests.get(chat_sn)
+        if cached is None:
+            cached = self._db.get_chat_request(chat_sn)
+            if cached is not None:
+                self.requests.put(chat_sn, cached)
+        return cached
+
+    def clear(self):
+        """유지보수 작업에서 행이 만료되는 등 DB 가 직접 변경된 경우 전체 캐시 무효화"""
+        self.responses.clear()
+        self.requests.clear()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {"responses": self.responses.stats(), "requests": self.requests.stats()}
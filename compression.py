@@ -0,0 +1,228 @@
+import gzip
+import zlib
+from typing import Iterable, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # requirements.txt 에 포함. 없는 환경에서는 br 협상만 제외
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # requirements.txt 에 포함. 없는 환경에서는 zstd 협상만 제외
+    zstandard = None
+
+try:
+    import msgpack
+except ImportError:  # requirements.txt 에 포함. 없는 환경에서는 NDJSON 으로만 응답
+    msgpack = None
+
+from models import EventType
+
+# 서버 선호 순서 (같은 q 값이면 앞쪽 인코딩 선택)
+SUPPORTED_ENCODINGS: List[str] = [
+    name for name, available in (
+        ("br", brotli is not None),
+        ("zstd", zstandard is not None),
+        ("gzip", True),
+    ) if available
+]
+
+# 이미 압축된 포맷이나 압축 효과가 없는 응답은 건너뜀
+SKIP_MEDIA_TYPES = ("image/", "video/", "audio/", "application/zip", "application/gzip")
+
+MSGPACK_MEDIA_TYPE = "application/x-msgpack"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# MessagePack 프레이밍에서 사용하는 이벤트 타입 코드 (클라이언트와 공유하므로 기존 코드 값 변경 금지)
+EVENT_TYPE_CODES = {
+    EventType.TEXT.value: 0,
+    EventType.JOB_TITLE_TEXT.value: 1,
+    EventType.JOB_DESCRIPTION_TEXT.value: 2,
+    EventType.REQUIRED_SKILL_TEXT.value: 3,
+    EventType.PREFERRED_SKILL_TEXT.value: 4,
+    EventType.MATCHING_TALENT.value: 5,
+    EventType.ERROR.value: 6,
+}
+
+
+def _parse_accept_header(value: str) -> List[Tuple[str, float]]:
+    items = []
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, params = part.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, raw = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(raw)
+                except ValueError:
+                    q = 0.0
+        items.append((name.strip().lower(), q))
+    return items
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Accept-Encoding 헤더를 보고 사용할 압축 방식을 고른다. 없으면 None"""
+    if not accept_encoding:
+        return None
+    accepted = dict(_parse_accept_header(accept_encoding))
+    wildcard = accepted.get("*")
+    best, best_q = None, 0.0
+    for name in SUPPORTED_ENCODINGS:
+        q = accepted.get(name, wildcard if wildcard is not None else 0.0)
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def wants_msgpack(accept: Optional[str]) -> bool:
+    """Accept 헤더가 MessagePack 프레이밍을 우선 요청하는지 확인"""
+    if not accept or msgpack is None:
+        return False
+    accepted = dict(_parse_accept_header(accept))
+    return accepted.get(MSGPACK_MEDIA_TYPE, 0.0) > 0.0 and \
+        accepted.get(MSGPACK_MEDIA_TYPE, 0.0) >= accepted.get(NDJSON_MEDIA_TYPE, 0.0)
+
+
+def pack_chunk(chunk_type: str, data) -> bytes:
+    """[타입 코드, 데이터] 형태의 MessagePack 프레임 (스트림에서 자체 구분 가능)"""
+    return msgpack.packb([EVENT_TYPE_CODES.get(chunk_type, chunk_type), data], use_bin_type=True)
+
+
+class StreamCompressor:
+    """청크 단위로 압축하고 매 청크마다 flush 해서 스트리밍 지연이 생기지 않게 한다"""
+
+    def __init__(self, encoding: str, level: Optional[int] = None):
+        self.encoding = encoding
+        if encoding == "gzip":
+            self._compressor = zlib.compressobj(level if level is not None else 6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        elif encoding == "br":
+            self._compressor = brotli.Compressor(quality=level if level is not None else 5)
+        elif encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=level if level is not None else 3).compressobj()
+        else:
+            raise ValueError(f"지원하지 않는 인코딩입니다: {encoding}")
+
+    def compress(self, data: bytes, flush: bool = True) -> bytes:
+        if self.encoding == "gzip":
+            out = self._compressor.compress(data)
+            return out + self._compressor.flush(zlib.Z_SYNC_FLUSH) if flush else out
+        if self.encoding == "br":
+            out = self._compressor.process(data)
+            return out + self._compressor.flush() if flush else out
+        out = self._compressor.compress(data)
+        return out + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK) if flush else out
+
+    def finish(self) -> bytes:
+        if self.encoding == "gzip":
+            return self._compressor.flush(zlib.Z_FINISH)
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+def compress_bytes(data: bytes, encoding: str) -> bytes:
+    """한 번에 압축 (스트리밍이 아닌 응답용)"""
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=6)
+    compressor = StreamCompressor(encoding)
+    return compressor.compress(data, flush=False) + compressor.finish()
+
+
+def decompress_bytes(data: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        return gzip.decompress(data)
+    if encoding == "br":
+        return brotli.decompress(data)
+    if encoding == "zstd":
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    raise ValueError(f"지원하지 않는 인코딩입니다: {encoding}")
+
+
+def _get_header(headers: Iterable[Tuple[bytes, bytes]], name: bytes) -> Optional[str]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+class CompressionMiddleware:
+    """Accept-Encoding 협상으로 gzip/br/zstd 압축을 적용하는 ASGI 미들웨어
+
+    응답 본문이 한 번에 오면 minimum_size 이상일 때만 압축하고,
+    스트리밍 응답(more_body)은 body 메시지마다 flush 해서 NDJSON 청크가 바로 전달되게 한다.
+    """
+
+    def __init__(self, app, minimum_size: int = 500):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(_get_header(scope.get("headers", []), b"accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor: Optional[StreamCompressor] = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                content_type = _get_header(headers, b"content-type") or ""
+                if _get_header(headers, b"content-encoding") or content_type.startswith(SKIP_MEDIA_TYPES):
+                    passthrough = True
+                    await send(message)
+                else:
+                    # 첫 body 메시지를 보고 압축 여부를 결정하므로 잠시 보류
+                    start_message = message
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start_message is not None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    start_message = None
+                    await send(message)
+                    return
+                headers = [
+                    (key, value) for key, value in start_message.get("headers", [])
+                    if key.lower() != b"content-length"
+                ]
+                headers.append((b"content-encoding", encoding.encode("latin-1")))
+                headers.append((b"vary", b"Accept-Encoding"))
+                compressor = StreamCompressor(encoding)
+                if not more_body:
+                    compressed = compress_bytes(body, encoding)
+                    headers.append((b"content-length", str(len(compressed)).encode("latin-1")))
+                    await send({**start_message, "headers": headers})
+                    start_message = None
+                    await send({"type": "http.response.body", "body": compressed, "more_body": False})
+                    return
+                await send({**start_message, "headers": headers})
+                start_message = None
+
+            if more_body:
+                await send({"type": "http.response.body", "body": compressor.compress(body), "more_body": True})
+            else:
+                data = compressor.compress(body, flush=False) + compressor.finish()
+                await send({"type": "http.response.body", "body": data, "more_body": False})
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,39 +1,80 @@
+import os
+import threading
+
 from tinydb import TinyDB, Query, where, JSONStorage
 from models import ChatRequest, ChatResponse
+from maintenance import ChatArchive
+from cache import CachedDatabase
 from datetime import datetime
+from typing import Optional
 
 class Database:
-    def __init__(self):
+    def __init__(self, path: str = 'db.json', archive_dir: Optional[str] = None):
             self.db = TinyDB(
-                'db.json',
-                encoding='utf-8',  
-                ensure_ascii=False 
+                path,
+                encoding='utf-8',
+                ensure_ascii=False
             )
             self.chat_request = self.db.table('chat_request')
             self.chat_response = self.db.table('chat_response')
+            # 오래된 chat_response 는 날짜별 압축 세그먼트로 이동
+            self.archive = ChatArchive(archive_dir or os.getenv('CHAT_ARCHIVE_DIR', 'archive'))
+            # TinyDB 는 스레드 안전하지 않으므로 읽기/쓰기 모두 직렬화.
+            # 유지보수 작업이 잡고 있을 수 있으므로 이벤트 루프에서는 executor 로 호출해야 함
+            self.lock = threading.RLock()
 
     def save_chat_request(self, chat_request: ChatRequest) -> int:
         data = chat_request.model_dump()
         data['created_at'] = datetime.now().isoformat()
-        
+
         # 기존 데이터 삭제 후 새로 삽입
-        self.chat_request.remove(where('chatSn') == chat_request.chatSn)
-        self.chat_request.insert(data)
+        with self.lock:
+            self.chat_request.remove(where('chatSn') == chat_request.chatSn)
+            self.chat_request.insert(data)
         return chat_request.chatSn
 
     def save_chat_response(self, chat_response: ChatResponse) -> int:
+        return self.insert_chat_response(self.build_chat_response_row(chat_response))
+
+    def build_chat_response_row(self, chat_response: ChatResponse) -> dict:
         data = chat_response.model_dump()
         data['created_at'] = datetime.now().isoformat()
-        return self.chat_response.insert(data)
+        return data
+
+    def insert_chat_response(self, data: dict) -> int:
+        with self.lock:
+            return self.chat_response.insert(data)
 
     def get_chat_responses(self, chat_sn: int) -> list:
-        return self.chat_response.search(where('chatSn') == chat_sn)
+        # 아카이브된 (오래된) 응답 뒤에 DB 에 남아있는 응답을 이어 붙임
+        with self.lock:
+            return self.archive.get(chat_sn) + self.chat_response.search(where('chatSn') == chat_sn)
 
     def get_chat_request(self, chat_sn: int) -> dict:
-        return self.chat_request.get(where('chatSn') == chat_sn)
+        with self.lock:
+            return self.chat_request.get(where('chatSn') == chat_sn)
 
     def get_all_chat_responses(self) -> list:
-        return self.chat_response.all()
+        with self.lock:
+            return self.chat_response.all()
+
+    def expire_chat_requests(self, before: str) -> int:
+        with self.lock:
+            return len(self.chat_request.remove(where('created_at') < before))
+
+    def expire_chat_responses(self, before: str) -> int:
+        with self.lock:
+            return len(self.chat_response.remove(where('created_at') < before))
+
+    def archive_chat_responses(self, before: str) -> int:
+        """before 이전에 생성된 chat_response 를 아카이브 세그먼트로 옮기고 DB 에서 삭제"""
+        with self.lock:
+            rows = self.chat_response.search(where('created_at') < before)
+            if not rows:
+                return 0
+            self.archive.append([dict(row) for row in rows])
+            self.chat_response.remove(doc_ids=[row.doc_id for row in rows])
+            return len(rows)
 
-# 데이터베이스 인스턴스 생성
-db = Database()
\ No newline at end of file
+# 데이터베이스 인스턴스 생성 (chatSn 단위 LRU 캐시로 감쌈)
+db = CachedDatabase(Database())
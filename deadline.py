@@ -0,0 +1,157 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Awaitable, Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+# 클라이언트가 남은 처리 시간(ms)을 알려주는 헤더
+DEADLINE_HEADER = b"x-request-deadline-ms"
+
+DEFAULT_DEADLINE_SECONDS = float(os.getenv("SOLVER_DEFAULT_DEADLINE_SECONDS", 30))
+
+# 라우트별 기본 마감 시간 (초). SOLVER_ROUTE_DEADLINES='{"/api/v1/chats/refine": 5}' 형식으로 덮어쓸 수 있음
+ROUTE_DEADLINE_SECONDS: Dict[str, float] = {
+    "/api/v1/chats/refine": 10,
+    "/api/v1/chats/validate": 10,
+    "/api/v1/chats/job-descriptions/filter": 15,
+    "/api/v1/chats/job-descriptions/filter/stream": 15,
+    # 응답 생성 태스크도 이 요청의 마감 시간을 물려받음
+    "/api/stream/v1/chats/responses": 60,
+    "/api/stream/v1/chats/{id}/responses/stream": 60,
+    "/api/stream/v1/chats/{id}/responses/sse": 60,
+    **json.loads(os.getenv("SOLVER_ROUTE_DEADLINES", "{}")),
+}
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def route_template(path: str) -> str:
+    """경로의 숫자 세그먼트를 {id} 로 바꿔 라우트 단위로 묶음"""
+    return _ID_SEGMENT.sub("/{id}", path)
+
+
+class DeadlineExceeded(Exception):
+    def __init__(self, stage: str):
+        super().__init__(f"Deadline exceeded at {stage}")
+        self.stage = stage
+
+
+@dataclass
+class RequestContext:
+    route: str
+    deadline: float  # time.monotonic() 기준
+
+    def remaining(self) -> float:
+        return self.deadline - time.monotonic()
+
+
+_current_context: ContextVar[Optional[RequestContext]] = ContextVar("request_context", default=None)
+
+# 라우트별 요청 수 (앱에 등록된 라우트만), (라우트, 단계)별 마감 초과 횟수
+deadline_metrics = {"requests": Counter(), "exceeded": Counter()}
+
+
+def current_context() -> Optional[RequestContext]:
+    return _current_context.get()
+
+
+def remaining(default: Optional[float] = None) -> Optional[float]:
+    """현재 요청의 남은 시간(초). 요청 컨텍스트가 없으면 default"""
+    context = _current_context.get()
+    if context is None:
+        return default
+    budget = max(context.remaining(), 0.0)
+    return budget if default is None else min(budget, default)
+
+
+def record_exceeded(stage: str):
+    context = _current_context.get()
+    route = context.route if context else "-"
+    deadline_metrics["exceeded"][(route, stage)] += 1
+    logger.warning(f"Deadline exceeded: route={route} stage={stage}")
+
+
+def check_deadline(stage: str):
+    """마감 시간이 지났으면 DeadlineExceeded 를 발생시켜 이후 작업을 중단"""
+    context = _current_context.get()
+    if context is not None and context.remaining() <= 0:
+        record_exceeded(stage)
+        raise DeadlineExceeded(stage)
+
+
+async def with_deadline(awaitable: Awaitable, stage: str):
+    """남은 시간 안에 끝나지 않으면 awaitable 을 취소하고 DeadlineExceeded 발생"""
+    try:
+        check_deadline(stage)
+    except DeadlineExceeded:
+        # 실행하지 않은 코루틴은 닫아서 'never awaited' 경고가 나지 않게 함
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise
+    budget = remaining()
+    try:
+        return await asyncio.wait_for(awaitable, timeout=budget)
+    except asyncio.TimeoutError:
+        record_exceeded(stage)
+        raise DeadlineExceeded(stage)
+
+
+def deadline_stats() -> dict:
+    return {
+        "requests": dict(deadline_metrics["requests"]),
+        "exceeded": {f"{route} {stage}": count for (route, stage), count in deadline_metrics["exceeded"].items()},
+    }
+
+
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceeded):
+    return JSONResponse(
+        status_code=504,
+        content={"detail": f"Deadline exceeded at {exc.stage}"},
+    )
+
+
+class DeadlineMiddleware:
+    """요청마다 마감 시간을 계산해 RequestContext 로 전달하는 ASGI 미들웨어
+
+    min(클라이언트 헤더, 라우트 기본값) 을 마감 시간으로 사용한다.
+    """
+
+    def __init__(self, app, default_seconds: float = DEFAULT_DEADLINE_SECONDS):
+        self.app = app
+        self.default_seconds = default_seconds
+
+    def _budget(self, route: str, headers) -> float:
+        budget = ROUTE_DEADLINE_SECONDS.get(route, self.default_seconds)
+        for key, value in headers:
+            if key.lower() == DEADLINE_HEADER:
+                try:
+                    budget = min(budget, int(value) / 1000)
+                except ValueError:
+                    pass
+        return budget
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = route_template(scope["path"])
+        budget = self._budget(route, scope.get("headers", []))
+        token = _current_context.set(RequestContext(route=route, deadline=time.monotonic() + budget))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_context.reset(token)
+            # 라우터가 매칭한 요청만 집계 (404 스캔 등 임의 경로로 카운터가 계속 늘어나지 않도록)
+            if scope.get("endpoint") is not None:
+                deadline_metrics["requests"][route] += 1
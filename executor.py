@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+from functools import partial
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from deadline import DeadlineExceeded, record_exceeded, remaining
+
+logger = logging.getLogger(__name__)
+
+# 워커 프로세스 수. 풀은 uvicorn 프로세스마다 따로 생기므로 --workers N 으로 띄우면 N x SOLVER_CPU_WORKERS 개가 뜬다.
+# 그래서 기본값은 CPU 수가 아니라 최대 4개로 제한
+SOLVER_CPU_WORKERS = int(os.getenv("SOLVER_CPU_WORKERS", min(4, os.cpu_count() or 1)))
+SOLVER_CPU_TIMEOUT_SECONDS = float(os.getenv("SOLVER_CPU_TIMEOUT_SECONDS", 30))
+# 시간 초과 후에도 이 시간(초) 동안 끝나지 않는 작업은 멈춘 것으로 보고 풀을 교체
+SOLVER_CPU_STUCK_GRACE_SECONDS = float(os.getenv("SOLVER_CPU_STUCK_GRACE_SECONDS", 5))
+
+# 워커 프로세스 안에서 한 번만 로딩하는 모델/인덱스 보관소
+worker_state: dict = {}
+
+# 워커 시작 시 실행할 초기화 함수 (pickle 가능한 모듈 수준 함수여야 함)
+_warmup_hooks: List[Callable[[], None]] = []
+
+
+def register_warmup(hook: Callable[[], None]) -> Callable[[], None]:
+    """워커 시작 시 실행할 초기화 함수 등록 (데코레이터로도 사용 가능)"""
+    _warmup_hooks.append(hook)
+    return hook
+
+
+def _init_worker(hooks: List[Callable[[], None]]):
+    for hook in hooks:
+        hook()
+
+
+def _ping() -> int:
+    # 한 워커가 모든 ping 을 처리하지 않도록 잠시 붙잡아 둠
+    time.sleep(0.05)
+    return os.getpid()
+
+
+class CpuExecutor:
+    """CPU 작업을 이벤트 루프 밖의 프로세스 풀에서 실행
+
+    start() 에서 워커를 미리 띄우고 등록된 warmup 함수로 모델/인덱스를 적재한다.
+    시작은 워커 기동을 기다리므로 이벤트 루프에서는 executor 로 호출해야 한다.
+    풀이 시작되지 않은 상태(스크립트, 단독 실행 등)에서는 기본 스레드 풀에서 실행한다.
+
+    프로세스 풀은 실행 중인 작업 하나만 중단할 수 없으므로, 시간 초과 후 stuck_grace 가 지나도
+    끝나지 않는 작업이 있으면 새 풀로 교체하고 이전 풀은 남은 작업이 끝나는 대로 프로세스를 종료한다.
+    """
+
+    def __init__(self, max_workers: int = SOLVER_CPU_WORKERS, timeout: float = SOLVER_CPU_TIMEOUT_SECONDS,
+                 stuck_grace: float = SOLVER_CPU_STUCK_GRACE_SECONDS):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.stuck_grace = stuck_grace
+        self.recycled = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # 풀별 실행 중/대기 중인 작업 (교체된 풀을 언제 종료할지 판단)
+        self._futures: Dict[ProcessPoolExecutor, Set[Future]] = {}
+        self._lock = threading.Lock()
+
+    def _create_pool(self) -> ProcessPoolExecutor:
+        # 이벤트 루프/스레드가 떠 있는 프로세스를 fork 하지 않도록 spawn 사용
+        pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(list(_warmup_hooks),)
+        )
+        self._futures[pool] = set()
+        return pool
+
+    def start(self):
+        if self._pool is not None:
+            return
+        self._pool = self._create_pool()
+        # 첫 요청이 워커 기동 비용을 치르지 않도록 미리 띄워 둠
+        pids = {future.result() for future in [self._pool.submit(_ping) for _ in range(self.max_workers)]}
+        logger.info(f"CPU 워커 {len(pids)}개 준비 완료")
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._futures.pop(self._pool, None)
+            self._pool = None
+
+    def _submit(self, call: Callable) -> Tuple[Optional[ProcessPoolExecutor], Optional[Future]]:
+        with self._lock:
+            pool = self._pool
+            if pool is None:
+                return None, None
+            future = pool.submit(call)
+            self._futures[pool].add(future)
+        future.add_done_callback(partial(self._discard, pool))
+        return pool, future
+
+    def _discard(self, pool: ProcessPoolExecutor, future: Future):
+        with self._lock:
+            self._futures.get(pool, set()).discard(future)
+
+    def _check_stuck(self, pool: ProcessPoolExecutor, future: Future):
+        """시간 초과된 작업이 stuck_grace 후에도 실행 중이면 풀 교체"""
+        if future.done():
+            return
+        with self._lock:
+            if self._pool is not pool:
+                return
+            self._pool = self._create_pool()
+            self.recycled += 1
+        logger.warning(f"CPU 작업이 시간 초과 후에도 끝나지 않아 워커 풀을 교체합니다 (누적 {self.recycled}회)")
+        threading.Thread(target=self._retire, args=(pool, future), daemon=True).start()
+
+    def _retire(self, pool: ProcessPoolExecutor, stuck: Future):
+        # 멈춘 작업 외에 남은 작업은 끝날 때까지 (최대 timeout) 기다린 뒤 워커 프로세스를 종료
+        with self._lock:
+            others = self._futures.get(pool, set()) - {stuck}
+        wait(others, timeout=self.timeout)
+        # ProcessPoolExecutor 는 개별 워커 종료 API 가 없으므로 내부 프로세스 목록을 직접 종료
+        processes = list((getattr(pool, "_processes", None) or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join(timeout=5)
+        with self._lock:
+            self._futures.pop(pool, None)
+
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs):
+        """fn(*args, **kwargs) 를 워커에서 실행하고 결과를 기다림
+
+        timeout 이 지나거나 호출한 태스크가 취소되면 대기 중인 작업은 취소된다.
+        이미 실행 중인 작업은 프로세스 안에서 끝까지 실행되고 결과만 버려진다.
+        요청 마감 시간이 더 짧으면 그 시간을 사용하고, 초과 시 DeadlineExceeded 를 발생시킨다.
+        """
+        task_timeout = timeout if timeout is not None else self.timeout
+        budget = remaining(task_timeout)
+        loop = asyncio.get_event_loop()
+        call = partial(fn, *args, **kwargs)
+        pool, pool_future = self._submit(call)
+        future = asyncio.wrap_future(pool_future) if pool_future is not None else loop.run_in_executor(None, call)
+        try:
+            return await asyncio.wait_for(future, timeout=budget)
+        except asyncio.TimeoutError:
+            if pool_future is not None and not pool_future.cancel():
+                # 이미 실행 중인 작업은 취소되지 않으므로 계속 멈춰 있으면 풀을 교체
+                loop.call_later(self.stuck_grace, self._check_stuck, pool, pool_future)
+            if budget < task_timeout:
+                record_exceeded("cpu")
+                raise DeadlineExceeded("cpu")
+            logger.warning(f"CPU 작업 시간 초과: {getattr(fn, '__name__', fn)}")
+            raise
+
+
+cpu_executor = CpuExecutor()
+
+
+async def run_cpu(fn: Callable, *args, timeout: Optional[float] = None, **kwargs):
+    """라우트에서 사용하는 공용 진입점: await run_cpu(fn, ...)"""
+    return await cpu_executor.run(fn, *args, timeout=timeout, **kwargs)
+
+
+# 큰 배열/바이트를 pickle 복사 없이 워커에 넘기기 위한 공유 메모리 핸들 (이름, 크기)
+SharedHandle = Tuple[str, int]
+
+
+@contextmanager
+def share_bytes(data):
+    """data 를 공유 메모리에 한 번 복사하고 워커에 넘길 핸들을 돌려줌. 블록을 벗어나면 해제"""
+    view = memoryview(data).cast("B")
+    shm = shared_memory.SharedMemory(create=True, size=max(len(view), 1))
+    try:
+        shm.buf[:len(view)] = view
+        yield shm.name, len(view)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+@contextmanager
+def attach_shared(handle: SharedHandle):
+    """워커에서 공유 메모리를 복사 없이 memoryview 로 열기"""
+    name, size = handle
+    # 풀 워커는 부모의 resource_tracker 를 공유하므로 해제(unlink)는 생성한 쪽에서만 한다
+    shm = shared_memory.SharedMemory(name=name)
+    view = shm.buf[:size]
+    try:
+        yield view
+    finally:
+        view.release()
+        shm.close()
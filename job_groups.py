@@ -0,0 +1,186 @@
+import json
+import logging
+import math
+import os
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+from cache import LRUCache
+from executor import register_warmup
+from models import JobDescriptionServiceDto, JobDto
+from normalization import normalize_text, normalize_texts
+
+logger = logging.getLogger(__name__)
+
+# 직군 코드의 기준이 되는 정의 파일 (JobDto 목록 JSON). 모든 프로세스가 시작 시 같은 파일을 읽음
+JOB_GROUPS_PATH = os.getenv("JOB_GROUPS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "job_groups.json"))
+# 분류할 수 없을 때 사용하는 직군 코드 (요청 후보에 없으면 후보 중 가장 작은 코드를 사용)
+DEFAULT_JOB_GROUP_CODE = int(os.getenv("DEFAULT_JOB_GROUP_CODE", 1))
+# 요청에서 보낸 직군 정의(기준 정의와 다른 것)와 요청 범위 카탈로그를 재사용하는 캐시 크기 (프로세스별)
+JOB_GROUP_CACHE_MAX_ENTRIES = int(os.getenv("JOB_GROUP_CACHE_MAX_ENTRIES", 256))
+
+_WORD = re.compile(r"\w+")
+
+
+def extract_features(text: str) -> Counter:
+    """단어 + 글자 bigram 특징 (한국어는 띄어쓰기/조사 차이가 커서 bigram 이 단어보다 안정적)"""
+    features = Counter()
+    for word in _WORD.findall(text.lower()):
+        features[word] += 1
+        for i in range(len(word) - 1):
+            features[word[i:i + 2]] += 1
+    return features
+
+
+class JobGroupEntry:
+    __slots__ = ("code", "name", "definition", "text", "features")
+
+    def __init__(self, job: JobDto):
+        self.code = job.jobGroupCode
+        self.name = job.jobGroupName
+        self.definition = job.jobDefinition
+        self.text = normalize_text(f"{job.jobGroupName}\n{job.jobDefinition}")
+        self.features = extract_features(self.text)
+
+    @property
+    def key(self) -> tuple:
+        return self.code, self.name, self.definition
+
+
+# 기준 카탈로그와 별도로 요청 정의로 만든 항목/카탈로그를 보관 (기준 카탈로그는 요청으로 바뀌지 않음)
+_request_entries = LRUCache(JOB_GROUP_CACHE_MAX_ENTRIES)
+_scoped_catalogs = LRUCache(JOB_GROUP_CACHE_MAX_ENTRIES)
+
+
+def _request_entry(job: JobDto) -> JobGroupEntry:
+    key = (job.jobGroupCode, job.jobGroupName, job.jobDefinition)
+    entry = _request_entries.get(key)
+    if entry is None:
+        entry = JobGroupEntry(job)
+        _request_entries.put(key, entry)
+    return entry
+
+
+class JobGroupCatalog:
+    """직군 정의를 한 번만 정규화/벡터화해 두고 채용 공고를 가장 가까운 직군 코드로 분류
+
+    직군별 TF-IDF 벡터는 특징 -> [(직군 코드, 가중치)] 역색인으로 보관해서
+    조회 시 공고에 등장한 특징의 목록만 합산한다 (희소 벡터 내적).
+    """
+
+    def __init__(self, entries: Iterable[JobGroupEntry] = ()):
+        self.entries: Dict[int, JobGroupEntry] = {entry.code: entry for entry in entries}
+        self._idf: Dict[str, float] = {}
+        self._postings: Dict[str, List[tuple]] = {}
+        if self.entries:
+            self._build_index()
+
+    def __contains__(self, code: int) -> bool:
+        return code in self.entries
+
+    def codes(self) -> Set[int]:
+        return set(self.entries)
+
+    def load_file(self, path: str):
+        if not os.path.exists(path):
+            logger.warning(f"직군 정의 파일이 없어 코드만 보낸 요청은 분류할 수 없습니다: {path}")
+            return
+        with open(path, encoding="utf-8") as f:
+            jobs = [JobDto(**item) for item in json.load(f)]
+        self.entries = {job.jobGroupCode: JobGroupEntry(job) for job in jobs}
+        self._build_index()
+        logger.info(f"직군 {len(self.entries)}개를 불러왔습니다: {path}")
+
+    def matches(self, job: JobDto) -> bool:
+        entry = self.entries.get(job.jobGroupCode)
+        return entry is not None and entry.name == job.jobGroupName and entry.definition == job.jobDefinition
+
+    def scoped(self, codes: Iterable[int], jobs: Iterable[JobDto]) -> "JobGroupCatalog":
+        """codes 의 등록된 직군 + 요청에서 보낸 직군 정의만으로 만든 요청 범위 카탈로그 (자신은 바꾸지 않음)
+
+        같은 직군 정의 조합이 반복되면 항목과 색인을 다시 만들지 않고 캐시된 카탈로그를 재사용한다.
+        """
+        entries = {code: self.entries[code] for code in codes if code in self.entries}
+        for job in jobs:
+            entries[job.jobGroupCode] = self.entries[job.jobGroupCode] if self.matches(job) else _request_entry(job)
+        key = tuple(sorted(entry.key for entry in entries.values()))
+        catalog = _scoped_catalogs.get(key)
+        if catalog is None:
+            catalog = JobGroupCatalog(entries.values())
+            _scoped_catalogs.put(key, catalog)
+        return catalog
+
+    def _build_index(self):
+        document_frequency = Counter()
+        for entry in self.entries.values():
+            document_frequency.update(entry.features.keys())
+        total = len(self.entries)
+        self._idf = {feature: math.log((1 + total) / (1 + count)) + 1 for feature, count in document_frequency.items()}
+
+        postings = defaultdict(list)
+        for entry in self.entries.values():
+            weights = {feature: count * self._idf[feature] for feature, count in entry.features.items()}
+            norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+            for feature, weight in weights.items():
+                postings[feature].append((entry.code, weight / norm))
+        self._postings = dict(postings)
+
+    def classify(self, job_description: JobDescriptionServiceDto,
+                 candidates: Optional[Set[int]] = None) -> Optional[int]:
+        """공고와 코사인 유사도가 가장 높은 직군 코드. candidates 가 있으면 그 안에서만 선택"""
+        if not self.entries:
+            return None
+        texts = normalize_texts([job_description.title, *job_description.descriptions,
+                                 *job_description.requiredSkills, *job_description.preferredSkills])
+        query = extract_features("\n".join(texts))
+
+        scores = defaultdict(float)
+        for feature, count in query.items():
+            idf = self._idf.get(feature)
+            if idf is None:
+                continue
+            weight = count * idf
+            for code, entry_weight in self._postings[feature]:
+                if candidates is None or code in candidates:
+                    scores[code] += weight * entry_weight
+        if not scores:
+            return None
+        return max(scores, key=scores.get)
+
+
+job_group_catalog = JobGroupCatalog()
+
+
+@register_warmup
+def load_job_group_catalog():
+    """기준 직군 정의를 프로세스마다 한 번 적재 (CPU 워커는 시작할 때 warmup 으로 미리 적재)"""
+    if not job_group_catalog.entries:
+        job_group_catalog.load_file(JOB_GROUPS_PATH)
+
+
+def classify_job_description(job_description: JobDescriptionServiceDto, job_group_codes: List[int],
+                             jobs: List[JobDto]) -> int:
+    """run_cpu 로 실행하는 분류 작업
+
+    요청에서 보낸 직군 정의가 기준 정의와 다르거나 처음 보는 직군이면 요청 범위 카탈로그를 따로 만들어 분류한다.
+    공용 카탈로그는 JOB_GROUPS_PATH 에서만 적재하고 요청으로는 바꾸지 않는다.
+    유사한 직군이 없으면 요청 후보 안에서 기본 코드를 고른다 (fallback_job_group_code).
+    """
+    load_job_group_catalog()
+    candidates = set(job_group_codes) | {job.jobGroupCode for job in jobs}
+    if all(job_group_catalog.matches(job) for job in jobs):
+        code = job_group_catalog.classify(job_description, candidates or None)
+    else:
+        code = job_group_catalog.scoped(job_group_codes, jobs).classify(job_description)
+    return code if code is not None else fallback_job_group_code(candidates)
+
+
+def fallback_job_group_code(candidates: Set[int]) -> int:
+    """DEFAULT_JOB_GROUP_CODE 가 후보에 있거나 후보가 없으면 그 코드, 아니면 후보 중 가장 작은 코드"""
+    if not candidates or DEFAULT_JOB_GROUP_CODE in candidates:
+        return DEFAULT_JOB_GROUP_CODE
+    return min(candidates)
+
+
+load_job_group_catalog()
@@ -1,6 +1,6 @@
+import asyncio
 import logging
 import os
-import re
 from enum import Enum
 from typing import List, Union, Optional
 from uuid import uuid4
@@ -11,19 +11,29 @@ from fastapi import HTTPException
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.docs import get_swagger_ui_html
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 
+from compression import CompressionMiddleware
+from traffic import TrafficRecorderMiddleware, traffic_recorder
+from deadline import DeadlineMiddleware, DeadlineExceeded, deadline_exceeded_handler, deadline_stats, \
+    check_deadline, record_exceeded, remaining, ROUTE_DEADLINE_SECONDS
+from executor import cpu_executor, run_cpu
 from models import SolverApiResponse, ChatRequest, DEFAULT_JOB_DESCRIPTIONS, DEFAULT_MATCHING_TALENT, ChatResponseJson, \
     JobDescriptionResponse, ChatSessionLog, EventType, Chunk, ChatValidRequest, ChatValidResponse, InputType, \
     JobDescriptionServiceDto, TalentsRecommendRs, JobDto
+from job_groups import job_group_catalog, classify_job_description
+from normalization import normalize_text, normalize_texts
+from solver_tasks import refine_contents
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # API 키 설정
 API_KEY = os.getenv("MATCHING_SOLVER_API_KEY", "matching-solver-api-key")
-MATCHING_SOLVER_BASE_URL = "https://match-solver-api.jobda.kr-dv-jainwon.com"
+MATCHING_SOLVER_BASE_URL = os.getenv("MATCHING_SOLVER_BASE_URL", "https://match-solver-api.jobda.kr-dv-jainwon.com")
+# 요청 컨텍스트 밖에서 호출될 때 사용하는 업스트림 타임아웃 (초)
+UPSTREAM_TIMEOUT_SECONDS = float(os.getenv("UPSTREAM_TIMEOUT_SECONDS", 30))
 
 app = FastAPI(
     title="Solver API Skeleton",
@@ -32,6 +42,22 @@ app = FastAPI(
 )
 
 
+@app.on_event("startup")
+async def start_cpu_executor():
+    # 워커 기동(warmup 포함)을 기다리는 동안 이벤트 루프를 막지 않도록 executor 에서 실행
+    await asyncio.get_event_loop().run_in_executor(None, cpu_executor.start)
+
+
+@app.on_event("shutdown")
+async def stop_cpu_executor():
+    cpu_executor.shutdown()
+
+
+@app.on_event("shutdown")
+async def flush_traffic():
+    await asyncio.wrap_future(traffic_recorder.flush())
+
+
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     logger.error(f"Validation error for request {request.url}:\n{exc.errors()}")
@@ -62,6 +88,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 응답 압축 (Accept-Encoding 협상: br > zstd > gzip)
+app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+# 요청별 마감 시간 (X-Request-Deadline-Ms 헤더, 라우트 기본값)
+app.add_middleware(DeadlineMiddleware)
+app.add_exception_handler(DeadlineExceeded, deadline_exceeded_handler)
+
+# 재생 부하 테스트용 요청 샘플링 (TRAFFIC_SAMPLE_RATE, businessNumber 는 익명화)
+app.add_middleware(TrafficRecorderMiddleware)
+
+
+@app.get("/metrics/deadlines", include_in_schema=False)
+async def get_deadline_metrics():
+    return deadline_stats()
+
 
 # async def verify_api_key(x_api_key: str = Header(None)):
 #     if x_api_key != API_KEY:
@@ -87,9 +128,10 @@ class SolverChatRefineRs(BaseModel):
 @app.post("/api/v1/chats/refine")
 async def refine_chat(request: SolverChatRefineRq) -> SolverApiResponse[SolverChatRefineRs]:
     try:
-        # 각 항목을 다듬는 예시 처리
-        refined = [f"[다듬다듬] {item}" for item in request.content]
+        refined = await run_cpu(refine_contents, request.content)
         return SolverApiResponse(success=True, data=SolverChatRefineRs(content=refined))
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logger.error(f"Error in refine_chat: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -153,9 +195,16 @@ async def create_chat_request(
 
 def post_request_function(url, header, body):
     try:
-        response = requests.post(url, headers=header, json=body)
+        check_deadline("upstream")
+        response = requests.post(url, headers=header, json=body, timeout=remaining(UPSTREAM_TIMEOUT_SECONDS))
         response.raise_for_status()
         return response
+    except requests.Timeout:
+        if remaining(UPSTREAM_TIMEOUT_SECONDS) <= 0:
+            record_exceeded("upstream")
+            raise DeadlineExceeded("upstream")
+        logger.error(f"API 호출 시간 초과: {url}")
+        raise
     except Exception as e:
         logger.error(f"API 호출 오류: {url} | {e}")
         raise
@@ -200,38 +249,32 @@ def call_matching_solver(chat_sn: int, content: str) -> ChatResponseJson:
 #         )
 
 
-def sanitize_text(text: str) -> str:
-    if not text:
-        return text
-    # BMP 범위 (0x0000 ~ 0xFFFF)만 허용 (utf8에서 문제 없는 문자들)
-    return re.sub(r'[^\u0000-\uFFFF]', '', text)
-
-
 def convert_solver_response_to_chunks(response: JobDescriptionResponse) -> ChatResponseJson:
     try:
         job_desc = response.jobDesc
         chat_sn = response.chatSn
 
+        # 업스트림 문자열은 모두 정규화 (NFC, 제어 문자/비 BMP 문자 제거, 공백 축약)
         chunks = [
-            Chunk(type=EventType.TEXT, data=response.chatResponse)
+            Chunk(type=EventType.TEXT, data=normalize_text(response.chatResponse))
         ]
 
         if job_desc.get("jobTitle"):
             chunks.append(Chunk(
                 type=EventType.JOB_TITLE_TEXT,
-                data=job_desc["jobTitle"]
+                data=normalize_text(job_desc["jobTitle"])
             ))
 
         if job_desc.get("mainResponsibilities"):
             chunks.append(Chunk(
                 type=EventType.JOB_DESCRIPTION_TEXT,
-                data="\n".join(job_desc["mainResponsibilities"])
+                data="\n".join(normalize_texts(job_desc["mainResponsibilities"]))
             ))
 
         if job_desc.get("qualifications"):
             chunks.append(Chunk(
                 type=EventType.REQUIRED_SKILL_TEXT,
-                data="\n".join(job_desc["qualifications"])
+                data="\n".join(normalize_texts(job_desc["qualifications"]))
             ))
 
         chunks.append(Chunk(
@@ -255,7 +298,10 @@ def convert_solver_response_to_chunks(response: JobDescriptionResponse) -> ChatR
 class TalentsRecommendRq(BaseModel):
     chatSn: int
     businessNumber: str
-    jobs: List[JobDto]
+    # 기준 직군 정의(JOB_GROUPS_PATH)에 있는 직군은 jobGroupCodes 로 코드만 보내도 됨.
+    # jobs 로 보낸 정의는 이 요청의 분류에만 사용됨
+    jobs: List[JobDto] = []
+    jobGroupCodes: List[int] = []
     jobDescription: JobDescriptionServiceDto
 
 
@@ -265,15 +311,29 @@ async def get_recommended_talents(
         # api_key: str = Depends(verify_api_key)
 ):
     try:
+        defined_codes = {job.jobGroupCode for job in talentsRq.jobs}
+        unknown_codes = sorted(code for code in set(talentsRq.jobGroupCodes)
+                               if code not in defined_codes and code not in job_group_catalog)
+        if unknown_codes:
+            raise HTTPException(
+                status_code=400,
+                detail=f"등록되지 않은 직군 코드입니다: {unknown_codes}"
+            )
+        job_group_code = await run_cpu(
+            classify_job_description, talentsRq.jobDescription, talentsRq.jobGroupCodes, talentsRq.jobs
+        )
+
         # TODO: 실제 추천 로직 구현
         # 임시로 더미 데이터 반환
         return SolverApiResponse(success=True, data=TalentsRecommendRs(
             chatSn=talentsRq.chatSn,
             jobDescriptionSn=talentsRq.jobDescription.sn,
             businessNumber=talentsRq.businessNumber,
-            jobGroupCode=1,
+            jobGroupCode=job_group_code,
             chunkRsList=DEFAULT_MATCHING_TALENT
         ))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in get_recommended_talents: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -373,76 +433,176 @@ class JobDescriptionFiltersRs(BaseModel):
     jobDescriptionSn: int
     businessNumber: str
     filters: List[FilterResult]
+    # 마감 시간 안에 생성되지 못한 필터가 있으면 True
+    isPartial: bool = False
+    missingTypes: List[ChatFilterType] = []
+
+
+# 필터 생성 전체에 주어지는 공통 마감 시간 (초). 라우트 마감 시간 설정(SOLVER_ROUTE_DEADLINES)을 그대로 사용
+FILTER_DEADLINE_SECONDS = ROUTE_DEADLINE_SECONDS["/api/v1/chats/job-descriptions/filter"]
+
+
+class JobDescriptionFiltersStreamEvent(BaseModel):
+    # FILTER: 완료된 필터 하나, END: 스트림 종료 (마감 시간 내 끝나지 않은 필터 목록 포함)
+    event: str
+    filter: Optional[FilterResult] = None
+    isPartial: bool = False
+    missingTypes: List[ChatFilterType] = []
+
+
+# 필터 타입별 필터 값 생성기 (실제 모델/업스트림 호출로 교체될 부분)
+async def produce_skill_filter(jobDescription: JobDescriptionServiceDto) -> SkillFilterRs:
+    return SkillFilterRs(skillList=[
+        SkillFilterDetailRs(skillCode=2, skillLevel=SkillLevel.BASIC),
+        SkillFilterDetailRs(skillCode=4, skillLevel=SkillLevel.BEGINNER),
+        SkillFilterDetailRs(skillCode=6, skillLevel=SkillLevel.MIDDLE),
+    ])
+
 
+async def produce_education_filter(jobDescription: JobDescriptionServiceDto) -> EducationFilterRs:
+    return EducationFilterRs(educationList=[
+        EducationFilterDetailRs(majorCode=1010101, educationLevel=EducationLevelType.BACHELOR),
+        EducationFilterDetailRs(majorCode=1010201, educationLevel=EducationLevelType.BACHELOR),
+        EducationFilterDetailRs(majorCode=1010301, educationLevel=EducationLevelType.BACHELOR),
+    ])
 
-def get_next_filter(chatSn: int, jobDescription: JobDescriptionServiceDto,
-                    businessNumber: str) -> JobDescriptionFiltersRs:
-    # 필터 타입과 해당 필터 값을 생성하는 함수 정의
-    filter_types = [
-        (ChatFilterType.SKILL, lambda: SkillFilterRs(skillList=[
-            SkillFilterDetailRs(skillCode=2, skillLevel=SkillLevel.BASIC),
-            SkillFilterDetailRs(skillCode=4, skillLevel=SkillLevel.BEGINNER),
-            SkillFilterDetailRs(skillCode=6, skillLevel=SkillLevel.MIDDLE),
-        ])),
-        (ChatFilterType.EDUCATION, lambda: EducationFilterRs(educationList=[
-            EducationFilterDetailRs(majorCode=1010101, educationLevel=EducationLevelType.BACHELOR),
-            EducationFilterDetailRs(majorCode=1010201, educationLevel=EducationLevelType.BACHELOR),
-            EducationFilterDetailRs(majorCode=1010301, educationLevel=EducationLevelType.BACHELOR),
-        ])),
-        (ChatFilterType.LICENSE, lambda: LicenseFilterRs(licenseCodes=[10001, 10002, 10003])),
-        (ChatFilterType.EXAMINATION, lambda: ExaminationFilterRs(examinationList=[
-            ExaminationFilterDetailRs(examinationCode=1, score=100, gradeCode=None),
-            ExaminationFilterDetailRs(examinationCode=2, score=None, gradeCode="A1")
-        ])),
-        (ChatFilterType.CAREER, lambda: CareerFilterRs(careerList=[
-            CareerFilterDetailRs(jobTitleCode="1", careerMonths=60, careerConditionType=CareerConditionType.UNDER),
-            CareerFilterDetailRs(jobTitleCode="2", careerMonths=1, careerConditionType=CareerConditionType.OVER)
-        ]))
-    ]
 
+async def produce_license_filter(jobDescription: JobDescriptionServiceDto) -> LicenseFilterRs:
+    return LicenseFilterRs(licenseCodes=[10001, 10002, 10003])
+
+
+async def produce_examination_filter(jobDescription: JobDescriptionServiceDto) -> ExaminationFilterRs:
+    return ExaminationFilterRs(examinationList=[
+        ExaminationFilterDetailRs(examinationCode=1, score=100, gradeCode=None),
+        ExaminationFilterDetailRs(examinationCode=2, score=None, gradeCode="A1")
+    ])
+
+
+async def produce_career_filter(jobDescription: JobDescriptionServiceDto) -> CareerFilterRs:
+    return CareerFilterRs(careerList=[
+        CareerFilterDetailRs(jobTitleCode="1", careerMonths=60, careerConditionType=CareerConditionType.UNDER),
+        CareerFilterDetailRs(jobTitleCode="2", careerMonths=1, careerConditionType=CareerConditionType.OVER)
+    ])
+
+
+# 응답에 담기는 필터 순서
+FILTER_PRODUCERS = {
+    ChatFilterType.SKILL: produce_skill_filter,
+    ChatFilterType.EDUCATION: produce_education_filter,
+    ChatFilterType.LICENSE: produce_license_filter,
+    ChatFilterType.EXAMINATION: produce_examination_filter,
+    ChatFilterType.CAREER: produce_career_filter,
+}
+
+FILTER_SUMMARY_LABELS = {
+    ChatFilterType.SKILL: "기술 스킬",
+    ChatFilterType.EDUCATION: "교육",
+    ChatFilterType.LICENSE: "자격증",
+    ChatFilterType.EXAMINATION: "시험",
+    ChatFilterType.CAREER: "경력",
+}
+
+FILTER_USER_QUERIES = {
+    ChatFilterType.SKILL: "자격 요건1",
+    ChatFilterType.EDUCATION: "자격 요건2",
+    ChatFilterType.LICENSE: "자격 요건3",
+    ChatFilterType.EXAMINATION: "자격 요건4",
+    ChatFilterType.CAREER: "자격 요건5"
+}
+
+
+async def generate_filter(filter_type: ChatFilterType, jobDescription: JobDescriptionServiceDto) -> FilterResult:
     skill_summary = ", ".join(jobDescription.requiredSkills)
-    summaries = {
-        ChatFilterType.SKILL: f"{skill_summary} 개발자 포지션에 대한 기술 스킬 필터입니다.",
-        ChatFilterType.EDUCATION: f"{skill_summary} 개발자 포지션에 대한 교육 필터입니다.",
-        ChatFilterType.LICENSE: f"{skill_summary} 개발자 포지션에 대한 자격증 필터입니다.",
-        ChatFilterType.EXAMINATION: f"{skill_summary} 개발자 포지션에 대한 시험 필터입니다.",
-        ChatFilterType.CAREER: f"{skill_summary} 개발자 포지션에 대한 경력 필터입니다."
-    }
+    return FilterResult(
+        type=filter_type,
+        summary=f"{skill_summary} 개발자 포지션에 대한 {FILTER_SUMMARY_LABELS[filter_type]} 필터입니다.",
+        userQuery=FILTER_USER_QUERIES[filter_type],
+        filterValue=await FILTER_PRODUCERS[filter_type](jobDescription)
+    )
+
 
-    userQueries = {
-        ChatFilterType.SKILL: "자격 요건1",
-        ChatFilterType.EDUCATION: "자격 요건2",
-        ChatFilterType.LICENSE: "자격 요건3",
-        ChatFilterType.EXAMINATION: "자격 요건4",
-        ChatFilterType.CAREER: "자격 요건5"
+def start_filter_tasks(jobDescription: JobDescriptionServiceDto) -> dict:
+    return {
+        asyncio.create_task(generate_filter(filter_type, jobDescription)): filter_type
+        for filter_type in FILTER_PRODUCERS
     }
 
-    # 모든 필터 타입에 대한 결과를 생성
-    filter_results = [
-        FilterResult(
-            type=filter_type,
-            summary=summaries[filter_type],
-            userQuery=userQueries[filter_type],
-            filterValue=filter_value_func()
-        )
-        for filter_type, filter_value_func in filter_types
-    ]
 
+def collect_filter_result(task: asyncio.Task, filter_type: ChatFilterType) -> Optional[FilterResult]:
+    if task.exception() is not None:
+        logger.error(f"Error generating {filter_type.value} filter: {task.exception()}", exc_info=task.exception())
+        return None
+    return task.result()
+
+
+async def get_next_filter(chatSn: int, jobDescription: JobDescriptionServiceDto,
+                          businessNumber: str, deadline: float = FILTER_DEADLINE_SECONDS) -> JobDescriptionFiltersRs:
+    # 모든 필터를 동시에 생성하고 마감 시간 안에 끝난 결과만 반환
+    tasks = start_filter_tasks(jobDescription)
+    done, pending = await asyncio.wait(tasks, timeout=remaining(deadline))
+    for task in pending:
+        task.cancel()
+    if pending:
+        record_exceeded("filter")
+
+    results = {}
+    for task in done:
+        result = collect_filter_result(task, tasks[task])
+        if result is not None:
+            results[tasks[task]] = result
+
+    missing_types = [filter_type for filter_type in FILTER_PRODUCERS if filter_type not in results]
     return JobDescriptionFiltersRs(
         chatSn=chatSn,
         jobDescriptionSn=jobDescription.sn,
         businessNumber=businessNumber,
-        filters=filter_results
+        filters=[results[filter_type] for filter_type in FILTER_PRODUCERS if filter_type in results],
+        isPartial=bool(missing_types),
+        missingTypes=missing_types
     )
 
 
+async def stream_next_filters(jobDescription: JobDescriptionServiceDto,
+                              deadline: float = FILTER_DEADLINE_SECONDS):
+    # 완료되는 순서대로 필터를 하나씩 내보내고, 마지막에 END 이벤트로 누락된 필터를 알림
+    tasks = start_filter_tasks(jobDescription)
+    loop = asyncio.get_event_loop()
+    expires_at = loop.time() + remaining(deadline)
+    pending = set(tasks)
+    completed = set()
+    try:
+        while pending:
+            timeout = expires_at - loop.time()
+            if timeout <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = collect_filter_result(task, tasks[task])
+                if result is not None:
+                    completed.add(tasks[task])
+                    yield JobDescriptionFiltersStreamEvent(event="FILTER", filter=result).model_dump_json() + "\n"
+    finally:
+        for task in pending:
+            task.cancel()
+        # 클라이언트 연결 종료로 중단된 경우는 마감 시간 초과로 집계하지 않음
+        if pending and loop.time() >= expires_at:
+            record_exceeded("filter")
+
+    missing_types = [filter_type for filter_type in FILTER_PRODUCERS if filter_type not in completed]
+    yield JobDescriptionFiltersStreamEvent(
+        event="END",
+        isPartial=bool(missing_types),
+        missingTypes=missing_types
+    ).model_dump_json() + "\n"
+
+
 @app.post("/api/v1/chats/job-descriptions/filter")
 async def get_job_description_filters(
         job_description_filter: JobDescriptionFiltersRq,
         # api_key: str = Depends(verify_api_key)
 ):
     try:
-        result = get_next_filter(
+        result = await get_next_filter(
             job_description_filter.chatSn,
             job_description_filter.jobDescription,
             job_description_filter.businessNumber)
@@ -455,6 +615,17 @@ async def get_job_description_filters(
         )
 
 
+@app.post("/api/v1/chats/job-descriptions/filter/stream")
+async def stream_job_description_filters(
+        job_description_filter: JobDescriptionFiltersRq,
+        # api_key: str = Depends(verify_api_key)
+):
+    return StreamingResponse(
+        stream_next_filters(job_description_filter.jobDescription),
+        media_type="application/x-ndjson"
+    )
+
+
 class FilterActionType(str, Enum):
     ADD = "ADD"
     MODIFY = "MODIFY"
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, HTTPException, Depends, Header
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 import asyncio
@@ -8,9 +8,16 @@ from typing import Dict, Optional
 import logging
 import os
 
-from models import ChatRequest, ChatResponse, DEFAULT_JOB_DESCRIPTIONS, chat_response_events
+from models import ChatRequest, ChatResponse, DEFAULT_JOB_DESCRIPTIONS, EventType, chat_response_events, \
+    chat_response_failures
 from database import db
+from maintenance import MaintenanceWorker
 from models import Chunk
+from compression import CompressionMiddleware, wants_msgpack, pack_chunk, MSGPACK_MEDIA_TYPE
+from broadcast import ChatBroadcaster, SSE_END_EVENT, chat_broadcasters
+from traffic import TrafficRecorderMiddleware, traffic_recorder
+from deadline import DeadlineMiddleware, DeadlineExceeded, deadline_exceeded_handler, deadline_stats, \
+    check_deadline, record_exceeded, remaining, with_deadline
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -33,6 +40,38 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 응답 압축 (Accept-Encoding 협상, NDJSON 스트림은 청크마다 flush)
+app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+# 요청별 마감 시간 (X-Request-Deadline-Ms 헤더, 라우트 기본값). 응답 생성 태스크도 마감 시간을 물려받음
+app.add_middleware(DeadlineMiddleware)
+app.add_exception_handler(DeadlineExceeded, deadline_exceeded_handler)
+
+# 재생 부하 테스트용 요청 샘플링 (TRAFFIC_SAMPLE_RATE, businessNumber 는 익명화)
+app.add_middleware(TrafficRecorderMiddleware)
+
+@app.get("/metrics/deadlines", include_in_schema=False)
+async def get_deadline_metrics():
+    return deadline_stats()
+
+# 생성 완료 후 늦게 접속한 구독자를 위해 브로드캐스터를 유지하는 시간 (초)
+BROADCAST_RETENTION_SECONDS = float(os.getenv("BROADCAST_RETENTION_SECONDS", 300))
+
+# 만료/아카이브/세그먼트 정리 백그라운드 작업
+maintenance_worker = MaintenanceWorker(db, on_change=db.clear)
+
+@app.on_event("startup")
+async def start_maintenance():
+    maintenance_worker.start()
+
+@app.on_event("shutdown")
+async def stop_maintenance():
+    await maintenance_worker.stop()
+
+@app.on_event("shutdown")
+async def flush_traffic():
+    await asyncio.wrap_future(traffic_recorder.flush())
+
 async def verify_api_key(x_api_key: str = Header(None)):
     if x_api_key != API_KEY:
         raise HTTPException(
@@ -41,14 +80,39 @@ async def verify_api_key(x_api_key: str = Header(None)):
         )
     return x_api_key
 
-async def generate_fake_responses(chat_sn: int):
+def fail_generation(chat_sn: int, event: asyncio.Event, stage: str):
+    # 대기 중인 스트림이 30초를 기다리지 않도록 실패를 기록하고 이벤트를 깨움
+    # (같은 chatSn 으로 다시 요청된 경우 새 생성 작업의 상태는 건드리지 않음)
+    if chat_response_events.get(chat_sn) is event:
+        chat_response_failures[chat_sn] = stage
+    event.set()
+
+def publish_chunk(broadcaster: ChatBroadcaster, chunk_type: str, data: str):
+    # SSE/WebSocket 구독자에게 문자 단위로 전달 (프레임당 한 번만 직렬화)
+    for char in data:
+        broadcaster.publish(Chunk(type=chunk_type, data=char).model_dump_json())
+
+def publish_error(broadcaster: ChatBroadcaster, message: str):
+    # 오류 메시지는 NDJSON 스트림과 같이 하나의 ERROR 프레임으로 전달
+    broadcaster.publish(Chunk(type=EventType.ERROR.value, data=message).model_dump_json())
+
+def close_broadcaster(broadcaster: ChatBroadcaster):
+    broadcaster.close()
+
+    def remove():
+        if chat_broadcasters.get(broadcaster.chat_sn) is broadcaster:
+            del chat_broadcasters[broadcaster.chat_sn]
+
+    asyncio.get_event_loop().call_later(BROADCAST_RETENTION_SECONDS, remove)
+
+async def generate_fake_responses(chat_sn: int, event: asyncio.Event, broadcaster: ChatBroadcaster):
     """8초에 걸쳐 fake 응답 데이터를 생성하고 DB에 저장"""
     try:
         ###################################################
         # 모델을 사용해서 chatResponse를 생성하는 코드로 변경되어야함
         ###################################################
         # 지연 시간 고의 추가 (모델 사용 시간)
-        await asyncio.sleep(3)
+        await with_deadline(asyncio.sleep(3), "generation")
 
         for chunk in DEFAULT_JOB_DESCRIPTIONS:
             # DB에 응답 저장
@@ -58,21 +122,28 @@ async def generate_fake_responses(chat_sn: int):
                 content=chunk.data
             )
         ###################################################
-         
+
+            check_deadline("db")
             await asyncio.get_event_loop().run_in_executor(
                 None, 
                 db.save_chat_response, 
                 chat_response
             )
+            publish_chunk(broadcaster, chunk.type, chunk.data)
         
         # 응답 생성 완료를 알림
-        if chat_sn in chat_response_events:
-            chat_response_events[chat_sn].set()
-            
+        event.set()
+
+    except DeadlineExceeded as e:
+        # 마감 시간 초과는 record_exceeded 에서 이미 기록됨
+        fail_generation(chat_sn, event, e.stage)
+        publish_error(broadcaster, "응답 생성 시간이 초과되었습니다.")
     except Exception as e:
         logger.error(f"Error generating responses for chatSn {chat_sn}: {str(e)}", exc_info=True)
-        if chat_sn in chat_response_events:
-            del chat_response_events[chat_sn]
+        fail_generation(chat_sn, event, "error")
+        publish_error(broadcaster, "응답 생성 중 오류가 발생했습니다.")
+    finally:
+        close_broadcaster(broadcaster)
 
 @app.post("/api/stream/v1/chats/responses")
 async def create_chat_request(
@@ -80,12 +151,15 @@ async def create_chat_request(
     api_key: str = Depends(verify_api_key)
 ):
     try:
-        # 채팅 요청 저장
-        db.save_chat_request(chat_request)
+        # 채팅 요청 저장 (DB 잠금을 유지보수 작업이 잡고 있을 수 있으므로 executor 에서 실행)
+        await asyncio.get_event_loop().run_in_executor(None, db.save_chat_request, chat_request)
         
         # 응답 생성 시작
-        chat_response_events[chat_request.chatSn] = asyncio.Event()
-        asyncio.create_task(generate_fake_responses(chat_request.chatSn))
+        # 이전 요청의 생성 작업이 남아 있어도 새 이벤트/브로드캐스터에는 쓰지 않도록 인스턴스를 넘김
+        chat_response_failures.pop(chat_request.chatSn, None)
+        event = chat_response_events[chat_request.chatSn] = asyncio.Event()
+        broadcaster = chat_broadcasters[chat_request.chatSn] = ChatBroadcaster(chat_request.chatSn)
+        asyncio.create_task(generate_fake_responses(chat_request.chatSn, event, broadcaster))
         
         return {"status": "success", "chatSn": chat_request.chatSn}
     except Exception as e:
@@ -98,7 +172,8 @@ async def create_chat_request(
 @app.get("/api/stream/v1/chats/{chat_sn}/responses/stream")
 async def stream(
     chat_sn: int,
-    api_key: str = Depends(verify_api_key)
+    api_key: str = Depends(verify_api_key),
+    accept: Optional[str] = Header(None)
 ):
     try:
         # 해당 chatSn에 대한 이벤트가 없으면 404 반환
@@ -108,49 +183,147 @@ async def stream(
                 detail="Chat response generation not started"
             )
         
-        # 30초 타임아웃으로 응답 생성 완료 대기
+        # 최대 30초 (요청 마감 시간이 더 짧으면 그 시간) 동안 응답 생성 완료 대기
         event = chat_response_events[chat_sn]
         try:
-            await asyncio.wait_for(event.wait(), timeout=30.0)
+            await asyncio.wait_for(event.wait(), timeout=remaining(30.0))
         except asyncio.TimeoutError:
-            del chat_response_events[chat_sn]
+            chat_response_events.pop(chat_sn, None)
+            if remaining(30.0) <= 0:
+                record_exceeded("stream_wait")
+                raise DeadlineExceeded("stream_wait")
             raise HTTPException(
                 status_code=408,
                 detail="Response generation timed out"
             )
-        
+
+        # 생성 태스크가 실패한 경우 (마감 시간 초과는 504, 그 외 오류는 500)
+        failure = chat_response_failures.pop(chat_sn, None)
+        if failure is not None:
+            chat_response_events.pop(chat_sn, None)
+            if failure != "error":
+                raise DeadlineExceeded(failure)
+            raise HTTPException(
+                status_code=500,
+                detail="Response generation failed"
+            )
+
+        # Accept 헤더로 MessagePack 프레이밍을 요청하면 [타입 코드, 문자] 바이너리 프레임으로 전송
+        use_msgpack = wants_msgpack(accept)
+
         # 응답 생성이 완료되면 DB에서 응답들을 가져와서 스트리밍
         async def stream_responses():
-            responses = db.get_chat_responses(chat_sn)
-            for response in responses:
-                chunk = Chunk(
-                    type=response['type'],
-                    data=response['content']
-                )
-                for char in chunk.data:
-                    partial_chunk = Chunk(
-                        type=chunk.type,
-                        data=char
+            try:
+                check_deadline("db")
+                responses = await asyncio.get_event_loop().run_in_executor(None, db.get_chat_responses, chat_sn)
+                for response in responses:
+                    # 마감 시간이 지나면 남은 스트림을 중단
+                    check_deadline("stream")
+                    chunk = Chunk(
+                        type=response['type'],
+                        data=response['content']
                     )
-                    yield partial_chunk.model_dump_json() + "\n"
-            
-            # 스트리밍 완료 후 이벤트 정리
-            del chat_response_events[chat_sn]
-        
+                    for char in chunk.data:
+                        if use_msgpack:
+                            yield pack_chunk(chunk.type, char)
+                            continue
+                        partial_chunk = Chunk(
+                            type=chunk.type,
+                            data=char
+                        )
+                        yield partial_chunk.model_dump_json() + "\n"
+            except DeadlineExceeded:
+                # 헤더가 이미 전송되었으므로 504 대신 마지막 ERROR 청크로 중단을 알리고 정상 종료
+                # (초과 횟수는 check_deadline 에서 기록됨)
+                message = "스트리밍 시간이 초과되었습니다."
+                if use_msgpack:
+                    yield pack_chunk(EventType.ERROR.value, message)
+                else:
+                    yield Chunk(type=EventType.ERROR.value, data=message).model_dump_json() + "\n"
+            finally:
+                # 스트리밍 완료(또는 중단) 후 이벤트 정리
+                chat_response_events.pop(chat_sn, None)
+
         return StreamingResponse(
             stream_responses(),
-            media_type="application/x-ndjson"
+            media_type=MSGPACK_MEDIA_TYPE if use_msgpack else "application/x-ndjson"
         )
-        
+
+    except (HTTPException, DeadlineExceeded):
+        chat_response_events.pop(chat_sn, None)
+        raise
     except Exception as e:
-        if chat_sn in chat_response_events:
-            del chat_response_events[chat_sn]
+        chat_response_events.pop(chat_sn, None)
         logger.error(f"Error in stream: {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=500,
             detail=f"Internal Solver Error: {str(e)}"
         )
 
+@app.get("/api/stream/v1/chats/{chat_sn}/responses/sse")
+async def stream_sse(
+    chat_sn: int,
+    api_key: str = Depends(verify_api_key),
+    last_event_id: Optional[str] = Header(None)
+):
+    # 생성 중인 청크를 실시간으로 전달 (늦게 접속하면 처음부터, 재접속이면 Last-Event-ID 다음부터 전송)
+    broadcaster = chat_broadcasters.get(chat_sn)
+    if broadcaster is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Chat response generation not started"
+        )
+    try:
+        resume_after = int(last_event_id) if last_event_id else 0
+    except ValueError:
+        resume_after = 0
+    subscriber = broadcaster.subscribe(resume_after)
+
+    async def stream_events():
+        try:
+            async for frame in subscriber.frames():
+                yield frame.sse
+            # 발행이 끝났으면 end 이벤트로 알려서 EventSource 가 재접속하지 않게 함
+            # (버퍼 초과로 끊긴 경우는 보내지 않으므로 브라우저가 Last-Event-ID 로 이어받음)
+            if not subscriber.disconnected:
+                yield SSE_END_EVENT
+        finally:
+            broadcaster.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        stream_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+@app.websocket("/api/stream/v1/chats/{chat_sn}/responses/ws")
+async def stream_websocket(
+    websocket: WebSocket,
+    chat_sn: int,
+    x_api_key: Optional[str] = Header(None),
+    api_key: Optional[str] = Query(None)
+):
+    # 브라우저 WebSocket API 는 헤더를 보낼 수 없으므로 api_key 쿼리 파라미터도 허용
+    if (x_api_key or api_key) != API_KEY:
+        await websocket.close(code=1008)
+        return
+    broadcaster = chat_broadcasters.get(chat_sn)
+    if broadcaster is None:
+        await websocket.close(code=1008, reason="Chat response generation not started")
+        return
+
+    await websocket.accept()
+    subscriber = broadcaster.subscribe()
+    try:
+        async for frame in subscriber.frames():
+            await websocket.send_text(frame.json)
+        # 버퍼 초과로 끊긴 구독자는 다시 접속하도록 1013 (Try Again Later) 으로 종료
+        await websocket.close(code=1013 if subscriber.disconnected else 1000)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        broadcaster.unsubscribe(subscriber)
+
 if __name__ == "__main_stream__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000) 
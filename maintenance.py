@@ -0,0 +1,270 @@
+import asyncio
+import gzip
+import json
+import logging
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _env_days(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+# 테이블별 보관 기간 (일). 0 이면 만료하지 않음
+TABLE_TTL_DAYS: Dict[str, int] = {
+    "chat_request": _env_days("CHAT_REQUEST_TTL_DAYS", 90),
+    "chat_response": _env_days("CHAT_RESPONSE_TTL_DAYS", 365),
+}
+# 이 기간이 지난 chat_response 는 DB 에서 아카이브 세그먼트로 이동
+ARCHIVE_AFTER_DAYS = _env_days("CHAT_RESPONSE_ARCHIVE_AFTER_DAYS", 7)
+MAINTENANCE_INTERVAL_SECONDS = float(os.getenv("MAINTENANCE_INTERVAL_SECONDS", 3600))
+
+
+class ChatArchive:
+    """오래된 채팅 응답을 날짜별 gzip 세그먼트(YYYY-MM-DD.ndjson.gz)로 보관
+
+    세그먼트 안에서는 chatSn 마다 별도의 gzip 멤버로 기록하고,
+    index.json 에 chatSn -> [날짜, 오프셋, 길이] 목록을 유지해서 조회 시 해당 채팅의 멤버만 읽어 압축을 푼다.
+    같은 채팅의 멤버가 한 세그먼트에 여러 개 쌓이면 compact() 에서 채팅별 하나의 멤버로 다시 쓴다.
+
+    쓰기(append/expire/compact)는 _write_lock 으로 직렬화하고, 조회와 공유하는 _lock 은
+    인덱스 교체와 파일 열기 동안만 잡는다. 세그먼트는 임시 파일에 쓴 뒤 교체하므로
+    이미 열어 둔 파일로 읽는 조회는 compact() 를 기다리지 않는다.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.index_path = os.path.join(root, "index.json")
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._index = None
+
+    def _segment_path(self, date: str) -> str:
+        return os.path.join(self.root, f"{date}.ndjson.gz")
+
+    def _load_index(self) -> dict:
+        if self._index is None:
+            if os.path.exists(self.index_path):
+                with open(self.index_path, encoding="utf-8") as f:
+                    self._index = json.load(f)
+            else:
+                self._index = {"chats": {}, "segments": {}}
+        return self._index
+
+    def _save_index(self, index: dict):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+    def _copy_index(self) -> dict:
+        with self._lock:
+            index = self._load_index()
+            return {
+                "chats": {chat_sn: [list(location) for location in locations]
+                          for chat_sn, locations in index["chats"].items()},
+                "segments": dict(index["segments"]),
+            }
+
+    def _publish_index(self, index: dict, replace: Optional[Dict[str, str]] = None,
+                       remove: Optional[List[str]] = None):
+        """인덱스 저장 + 세그먼트 교체/삭제를 조회와 겹치지 않게 한 번에 반영"""
+        with self._lock:
+            for date, tmp_path in (replace or {}).items():
+                os.replace(tmp_path, self._segment_path(date))
+            for date in remove or []:
+                path = self._segment_path(date)
+                if os.path.exists(path):
+                    os.remove(path)
+            self._save_index(index)
+            self._index = index
+
+    @staticmethod
+    def _encode(rows: List[dict]) -> bytes:
+        payload = "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+        return gzip.compress(payload.encode("utf-8"))
+
+    @staticmethod
+    def _decode(member: bytes) -> List[dict]:
+        return [json.loads(line) for line in gzip.decompress(member).decode("utf-8").splitlines() if line.strip()]
+
+    @staticmethod
+    def _group_by_chat(rows: List[dict]) -> Dict[str, List[dict]]:
+        by_chat = defaultdict(list)
+        for row in rows:
+            by_chat[str(row["chatSn"])].append(row)
+        return by_chat
+
+    def append(self, rows: List[dict]) -> int:
+        if not rows:
+            return 0
+        by_date = defaultdict(list)
+        for row in rows:
+            by_date[row["created_at"][:10]].append(row)
+
+        with self._write_lock:
+            index = self._copy_index()
+            os.makedirs(self.root, exist_ok=True)
+            for date, date_rows in by_date.items():
+                # 기존 멤버의 오프셋은 그대로이므로 파일 끝에 이어 쓰고 인덱스만 교체
+                with open(self._segment_path(date), "ab") as f:
+                    offset = f.tell()
+                    for chat_sn, chat_rows in self._group_by_chat(date_rows).items():
+                        member = self._encode(chat_rows)
+                        f.write(member)
+                        index["chats"].setdefault(chat_sn, []).append([date, offset, len(member)])
+                        index["segments"][date] = index["segments"].get(date, 0) + 1
+                        offset += len(member)
+            for locations in index["chats"].values():
+                locations.sort()
+            self._publish_index(index)
+        return len(rows)
+
+    def _read_members(self, f, locations: List[list]) -> List[dict]:
+        rows = []
+        for _, offset, length in locations:
+            f.seek(offset)
+            rows.extend(self._decode(f.read(length)))
+        return rows
+
+    def get(self, chat_sn: int) -> List[dict]:
+        by_date = defaultdict(list)
+        handles = {}
+        with self._lock:
+            for location in self._load_index()["chats"].get(str(chat_sn), []):
+                by_date[location[0]].append(location)
+            # 파일을 연 뒤에는 compact()/expire() 가 세그먼트를 교체해도 열어 둔 파일로 읽을 수 있음
+            for date in by_date:
+                path = self._segment_path(date)
+                if os.path.exists(path):
+                    handles[date] = open(path, "rb")
+        rows = []
+        for date in sorted(by_date):
+            if date in handles:
+                with handles[date] as f:
+                    rows.extend(self._read_members(f, by_date[date]))
+        return rows
+
+    def expire(self, before_date: str) -> int:
+        """before_date(YYYY-MM-DD) 이전 세그먼트 삭제. 삭제한 세그먼트 수를 반환"""
+        with self._write_lock:
+            index = self._copy_index()
+            expired = [date for date in index["segments"] if date < before_date]
+            if not expired:
+                return 0
+            for date in expired:
+                del index["segments"][date]
+            for chat_sn in list(index["chats"]):
+                locations = [location for location in index["chats"][chat_sn] if location[0] >= before_date]
+                if locations:
+                    index["chats"][chat_sn] = locations
+                else:
+                    del index["chats"][chat_sn]
+            self._publish_index(index, remove=expired)
+        return len(expired)
+
+    def compact(self) -> int:
+        """같은 채팅의 멤버가 여러 개로 쪼개진 세그먼트를 채팅별 하나의 멤버로 다시 압축. 정리한 세그먼트 수를 반환"""
+        with self._write_lock:
+            index = self._copy_index()
+            by_date = defaultdict(lambda: defaultdict(list))
+            for chat_sn, locations in index["chats"].items():
+                for location in locations:
+                    by_date[location[0]][chat_sn].append(location)
+            targets = [date for date, chats in by_date.items()
+                       if any(len(locations) > 1 for locations in chats.values())]
+            if not targets:
+                return 0
+
+            replace = {}
+            for date in targets:
+                chats = by_date[date]
+                tmp_path = self._segment_path(date) + ".tmp"
+                offset = 0
+                with open(self._segment_path(date), "rb") as src, open(tmp_path, "wb") as dst:
+                    for chat_sn in sorted(chats, key=int):
+                        member = self._encode(self._read_members(src, chats[chat_sn]))
+                        dst.write(member)
+                        index["chats"][chat_sn] = [location for location in index["chats"][chat_sn]
+                                                   if location[0] != date] + [[date, offset, len(member)]]
+                        index["chats"][chat_sn].sort()
+                        offset += len(member)
+                index["segments"][date] = len(chats)
+                replace[date] = tmp_path
+            self._publish_index(index, replace=replace)
+        return len(targets)
+
+
+class MaintenanceWorker:
+    """주기적으로 만료/아카이브/세그먼트 정리를 수행하는 백그라운드 작업"""
+
+    def __init__(
+            self,
+            database,
+            interval_seconds: float = MAINTENANCE_INTERVAL_SECONDS,
+            ttl_days: Optional[Dict[str, int]] = None,
+            archive_after_days: int = ARCHIVE_AFTER_DAYS,
+            on_change: Optional[Callable[[], None]] = None,
+    ):
+        self.database = database
+        self.interval_seconds = interval_seconds
+        self.ttl_days = ttl_days if ttl_days is not None else dict(TABLE_TTL_DAYS)
+        self.archive_after_days = archive_after_days
+        self.on_change = on_change
+        self._task: Optional[asyncio.Task] = None
+
+    def run_once(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        now = now or datetime.now()
+        stats = {"expired_requests": 0, "expired_responses": 0, "archived_responses": 0,
+                 "expired_segments": 0, "compacted_segments": 0}
+
+        request_ttl = self.ttl_days.get("chat_request", 0)
+        if request_ttl > 0:
+            cutoff = (now - timedelta(days=request_ttl)).isoformat()
+            stats["expired_requests"] = self.database.expire_chat_requests(cutoff)
+
+        response_ttl = self.ttl_days.get("chat_response", 0)
+        if response_ttl > 0:
+            cutoff = now - timedelta(days=response_ttl)
+            stats["expired_responses"] = self.database.expire_chat_responses(cutoff.isoformat())
+            stats["expired_segments"] = self.database.archive.expire(cutoff.date().isoformat())
+
+        if self.archive_after_days > 0:
+            cutoff = (now - timedelta(days=self.archive_after_days)).isoformat()
+            stats["archived_responses"] = self.database.archive_chat_responses(cutoff)
+
+        stats["compacted_segments"] = self.database.archive.compact()
+
+        # 아카이브/세그먼트 정리는 조회 결과를 바꾸지 않으므로 만료된 행이 있을 때만 알림
+        if self.on_change and any(stats[key] for key in ("expired_requests", "expired_responses", "expired_segments")):
+            self.on_change()
+        logger.info(f"DB 유지보수 완료: {stats}")
+        return stats
+
+    async def _loop(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            try:
+                await loop.run_in_executor(None, self.run_once)
+            except Exception as e:
+                logger.error(f"Error in maintenance: {str(e)}", exc_info=True)
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
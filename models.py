@@ -125,4 +125,6 @@ DEFAULT_MATCHING_TALENT = [
     Chunk(type=EventType.MATCHING_TALENT, data=["cano721", "cano721", "cano721", "cano721", "cano721"])
 ]
 # 진행 중인 채팅 응답 생성 작업을 추적하기 위한 전역 상태
-chat_response_events: Dict[int, asyncio.Event] = {}
\ No newline at end of file
+chat_response_events: Dict[int, asyncio.Event] = {}
+# 응답 생성에 실패한 채팅의 실패 단계 (이벤트와 함께 설정되어 대기 중인 스트림이 바로 실패를 알 수 있음)
+chat_response_failures: Dict[int, str] = {}
\ No newline at end of file
@@ -0,0 +1,259 @@
+"""기록된 트래픽을 로컬 솔버 API 에 재생하는 부하 도구
+
+사용법:
+    python replay.py traffic/2026-10-19.ndjson.gz --spawn main_json:app --speeds 1,2,4,8
+    python replay.py traffic/*.ndjson.gz --target http://localhost:8000 --api-key matching-solver-api-key
+
+배속마다 원래 요청 간격을 speed 로 나눠 재생하고, 라우트별 지연 시간 분포와 포화 지점을 출력한다.
+--spawn 을 주면 스텁 업스트림을 띄우고 MATCHING_SOLVER_BASE_URL 을 그쪽으로 돌린 uvicorn 을
+임시 작업 디렉터리에서 실행한다 (실제 db.json/archive 는 건드리지 않음).
+"""
+import argparse
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from deadline import route_template
+from traffic import load_records
+
+STUB_LATENCY_SECONDS = float(os.getenv("REPLAY_STUB_LATENCY_SECONDS", 0.2))
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class StubUpstreamHandler(BaseHTTPRequestHandler):
+    """call_matching_solver 가 호출하는 업스트림 응답을 흉내내는 스텁"""
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        time.sleep(STUB_LATENCY_SECONDS)
+        payload = json.dumps({"data": {
+            "chatSessionId": body.get("chatSessionId", "stub"),
+            "chatResponse": "재무회계 담당자를 찾고 계시군요!",
+            "jobDesc": {
+                "jobTitle": "재경본부 신입",
+                "mainResponsibilities": ["자금 조달 및 지출 관리", "재무제표 작성 및 분석 지원"],
+                "qualifications": ["회계 및 세무 관련 경력 1년 이상"],
+            },
+            "chatSessionLogModel": {"chat": [], "cost": 0.0},
+        }}, ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_stub_upstream() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", free_port()), StubUpstreamHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def spawn_app(app: str, upstream_url: str, workdir: str) -> Tuple[subprocess.Popen, str]:
+    """workdir 를 작업 디렉터리로 앱을 실행 (db.json, 아카이브가 모두 그 안에 생성됨)"""
+    port = free_port()
+    env = {
+        **os.environ,
+        "MATCHING_SOLVER_BASE_URL": upstream_url,
+        "TRAFFIC_SAMPLE_RATE": "0",
+        "CHAT_ARCHIVE_DIR": os.path.join(workdir, "archive"),
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--app-dir", APP_DIR,
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env=env,
+        cwd=workdir
+    )
+    target = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            requests.get(f"{target}/openapi.json", timeout=1)
+            return process, target
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"{app} 실행에 실패했습니다.")
+
+
+def served_routes(target: str) -> List[Tuple[str, re.Pattern]]:
+    """대상 앱의 openapi.json 에서 (메서드, 경로 정규식) 목록을 만듦"""
+    paths = requests.get(f"{target}/openapi.json", timeout=10).json().get("paths", {})
+    routes = []
+    for path, operations in paths.items():
+        pattern = re.compile("^" + re.sub(r"\\\{[^}]+\\\}", "[^/]+", re.escape(path)) + "$")
+        routes.extend((method.upper(), pattern) for method in operations)
+    return routes
+
+
+def filter_served(records: List[dict], routes: List[Tuple[str, re.Pattern]]) -> List[dict]:
+    return [record for record in records
+            if any(record["m"] == method and pattern.match(record["p"]) for method, pattern in routes)]
+
+
+_local = threading.local()
+
+
+def send(target: str, record: dict, api_key: Optional[str], timeout: float, scheduled: float) -> Tuple[int, float]:
+    """요청을 보내고 (상태 코드, 지연 시간 ms) 를 반환
+
+    지연 시간은 예정된 전송 시각(scheduled, perf_counter 기준)부터 잰다.
+    워커가 모두 바빠서 늦게 보낸 시간도 포함해야 포화 구간의 지연이 과소 측정되지 않는다.
+    """
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = requests.Session()
+    headers = dict(record.get("h", {}))
+    if api_key:
+        headers["x-api-key"] = api_key
+    url = f"{target}{record['p']}" + (f"?{record['q']}" if record.get("q") else "")
+    try:
+        response = session.request(
+            record["m"], url, headers=headers,
+            data=json.dumps(record["b"], ensure_ascii=False).encode("utf-8") if record.get("b") is not None else None,
+            timeout=timeout
+        )
+        # 스트리밍 응답도 끝까지 읽은 시간을 측정
+        _ = response.content
+        status = response.status_code
+    except requests.RequestException:
+        status = 0
+    return status, (time.perf_counter() - scheduled) * 1000
+
+
+def percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def run(records: List[dict], target: str, speed: float, api_key: Optional[str], workers: int, timeout: float) -> dict:
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    lock = threading.Lock()
+    origin = records[0]["t"]
+
+    def task(record, scheduled):
+        status, elapsed = send(target, record, api_key, timeout, scheduled)
+        route = f"{record['m']} {route_template(record['p'])}"
+        with lock:
+            latencies[route].append(elapsed)
+            # 원래 기록된 상태 코드와 다르게 실패한 요청만 오류로 집계
+            # (404 도 포함: 생성 요청 없이 재생된 스트림 조회는 바로 404 가 나서 지연 시간이 과소 측정됨)
+            recorded = record.get("s") or 0
+            if status == 0 or (status >= 500 and recorded < 500) or (status == 404 and recorded != 404):
+                errors[route] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for record in records:
+            scheduled = started + (record["t"] - origin) / speed
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(task, record, scheduled)
+    elapsed = time.perf_counter() - started
+
+    # 배속을 적용한 원래 요청 간격 기준의 요청률 (실제 처리 시간과 무관)
+    duration = (records[-1]["t"] - origin) / speed
+    offered = len(records) / duration if duration > 0 else float("inf")
+    return {"speed": speed, "latencies": latencies, "errors": errors,
+            "offered_rps": offered, "achieved_rps": len(records) / elapsed}
+
+
+def report(result: dict, p99_threshold_ms: float, error_threshold: float) -> bool:
+    print(f"\n== x{result['speed']:g}  offered {result['offered_rps']:.1f} rps, "
+          f"achieved {result['achieved_rps']:.1f} rps")
+    print(f"{'route':<60}{'count':>7}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}{'errors':>8}")
+    saturated = False
+    total = total_errors = 0
+    for route in sorted(result["latencies"]):
+        values = result["latencies"][route]
+        p99 = percentile(values, 99)
+        total += len(values)
+        total_errors += result["errors"][route]
+        saturated = saturated or p99 > p99_threshold_ms
+        print(f"{route:<60}{len(values):>7}{percentile(values, 50):>9.1f}{percentile(values, 90):>9.1f}"
+              f"{p99:>9.1f}{max(values):>9.1f}{result['errors'][route]:>8}")
+    return saturated or bool(total and total_errors / total > error_threshold)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="기록된 트래픽 재생")
+    parser.add_argument("logs", nargs="+", help="traffic 로그 파일 (.ndjson.gz)")
+    parser.add_argument("--target", help="대상 서버 URL (지정하지 않으면 --spawn 필요)")
+    parser.add_argument("--spawn", help="로컬에서 실행할 앱 (예: main_json:app, main_stream:app)")
+    parser.add_argument("--speeds", default="1,2,4,8", help="재생 배속 목록")
+    parser.add_argument("--api-key", default=os.getenv("MATCHING_SOLVER_API_KEY", "matching-solver-api-key"))
+    parser.add_argument("--workers", type=int, default=64)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--p99-threshold-ms", type=float, default=1000.0)
+    parser.add_argument("--error-threshold", type=float, default=0.01)
+    args = parser.parse_args()
+
+    records = load_records(args.logs)
+    if not records:
+        print("재생할 요청이 없습니다.")
+        return
+
+    stub = process = workdir = None
+    target = args.target
+    try:
+        if args.spawn:
+            stub = start_stub_upstream()
+            workdir = tempfile.TemporaryDirectory(prefix="replay-")
+            process, target = spawn_app(args.spawn, f"http://127.0.0.1:{stub.server_address[1]}", workdir.name)
+            # main_json/main_stream 트래픽이 한 로그에 섞여 있으므로 띄운 앱이 처리하는 라우트만 재생
+            served = filter_served(records, served_routes(target))
+            if len(served) < len(records):
+                print(f"{args.spawn} 가 처리하지 않는 요청 {len(records) - len(served)}개는 건너뜁니다.")
+            records = served
+            if not records:
+                print("재생할 요청이 없습니다.")
+                return
+        elif not target:
+            parser.error("--target 또는 --spawn 중 하나는 필요합니다.")
+
+        saturation = None
+        for speed in [float(value) for value in args.speeds.split(",")]:
+            result = run(records, target, speed, args.api_key, args.workers, args.timeout)
+            if report(result, args.p99_threshold_ms, args.error_threshold) and saturation is None:
+                saturation = result
+        if saturation:
+            print(f"\n포화 지점: x{saturation['speed']:g} (offered {saturation['offered_rps']:.1f} rps)")
+        else:
+            print("\n모든 배속에서 기준 이내입니다.")
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+        if stub:
+            stub.shutdown()
+        if workdir:
+            workdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+from typing import List
+
+from normalization import normalize_texts
+
+# 프로세스 풀 워커에서 실행되는 CPU 작업 모음
+# (spawn 된 워커가 import 하므로 FastAPI 앱 등 무거운 모듈은 import 하지 않는다)
+
+
+def refine_contents(contents: List[str]) -> List[str]:
+    # 각 항목을 다듬는 예시 처리
+    return [f"[다듬다듬] {item}" for item in normalize_texts(contents)]
@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+# 저장소 루트의 모듈(database, cache 등)을 그대로 import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """임시 디렉터리의 TinyDB + 아카이브를 사용하는 Database (모듈 전역 db 도 임시 디렉터리에 생성됨)"""
+    monkeypatch.chdir(tmp_path)
+    from database import Database
+    return Database(str(tmp_path / "db.json"), str(tmp_path / "archive"))
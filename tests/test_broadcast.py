@@ -0,0 +1,181 @@
+import asyncio
+import json
+
+import pytest
+
+from broadcast import SSE_END_EVENT, ChatBroadcaster
+
+
+async def _drain(subscriber) -> list:
+    return [frame async for frame in subscriber.frames()]
+
+
+def _publish(broadcaster: ChatBroadcaster, *chars: str):
+    for char in chars:
+        broadcaster.publish(json.dumps({"type": "TEXT", "data": char}))
+
+
+def _data(frames) -> str:
+    return "".join(json.loads(frame.json)["data"] for frame in frames)
+
+
+@pytest.fixture
+def main_stream(tmp_path, monkeypatch):
+    # main_stream 을 처음 import 할 때 만들어지는 db.json 이 저장소에 생기지 않도록 임시 디렉터리에서 import
+    monkeypatch.chdir(tmp_path)
+    import main_stream
+    return main_stream
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+        self.accepted = False
+        self.close_code = None
+
+    async def accept(self):
+        self.accepted = True
+
+    async def send_text(self, text: str):
+        self.sent.append(text)
+
+    async def close(self, code: int = 1000, reason: str = None):
+        self.close_code = code
+
+
+def test_late_subscriber_gets_history_then_live_frames():
+    async def scenario():
+        broadcaster = ChatBroadcaster(1)
+        _publish(broadcaster, "재", "무")
+        subscriber = broadcaster.subscribe()
+        _publish(broadcaster, "회", "계")
+        broadcaster.close()
+        return await _drain(subscriber)
+
+    frames = asyncio.run(scenario())
+    assert _data(frames) == "재무회계"
+    assert [frame.id for frame in frames] == [1, 2, 3, 4]
+
+
+def test_close_ends_waiting_frames_iterator():
+    async def scenario():
+        broadcaster = ChatBroadcaster(1)
+        subscriber = broadcaster.subscribe()
+        task = asyncio.create_task(_drain(subscriber))
+        await asyncio.sleep(0)
+        _publish(broadcaster, "a")
+        await asyncio.sleep(0)
+        broadcaster.close()
+        return await asyncio.wait_for(task, timeout=1)
+
+    assert _data(asyncio.run(scenario())) == "a"
+
+
+def test_subscribe_after_close_replays_and_ends():
+    async def scenario():
+        broadcaster = ChatBroadcaster(1)
+        _publish(broadcaster, "a", "b")
+        broadcaster.close()
+        return await asyncio.wait_for(_drain(broadcaster.subscribe()), timeout=1)
+
+    assert _data(asyncio.run(scenario())) == "ab"
+
+
+def test_resume_from_last_event_id():
+    async def scenario():
+        broadcaster = ChatBroadcaster(1)
+        _publish(broadcaster, "a", "b", "c")
+        broadcaster.close()
+        return await _drain(broadcaster.subscribe(last_event_id=2))
+
+    frames = asyncio.run(scenario())
+    assert [frame.id for frame in frames] == [3]
+    assert frames[0].sse == f'id: 3\ndata: {frames[0].json}\n\n'
+
+
+def test_drop_policy_discards_oldest_frames():
+    async def scenario():
+        broadcaster = ChatBroadcaster(1, buffer_size=2, policy="drop")
+        subscriber = broadcaster.subscribe()
+        _publish(broadcaster, "a", "b", "c", "d")
+        broadcaster.close()
+        frames = await _drain(subscriber)
+        broadcaster.unsubscribe(subscriber)
+        return frames, subscriber, broadcaster
+
+    frames, subscriber, broadcaster = asyncio.run(scenario())
+    assert _data(frames) == "cd"
+    assert subscriber.dropped == 2
+    assert not subscriber.disconnected
+    assert broadcaster.subscribers == []
+
+
+def test_disconnect_policy_stops_slow_subscriber():
+    async def scenario():
+        broadcaster = ChatBroadcaster(1, buffer_size=2, policy="disconnect")
+        subscriber = broadcaster.subscribe()
+        _publish(broadcaster, "a", "b", "c")
+        return await _drain(subscriber), subscriber
+
+    frames, subscriber = asyncio.run(scenario())
+    assert frames == []
+    assert subscriber.disconnected
+
+
+def test_websocket_closes_slow_subscriber_with_1013(main_stream, monkeypatch):
+    async def scenario():
+        broadcaster = ChatBroadcaster(31, buffer_size=2, policy="disconnect")
+        monkeypatch.setitem(main_stream.chat_broadcasters, 31, broadcaster)
+        websocket = FakeWebSocket()
+        task = asyncio.create_task(main_stream.stream_websocket(websocket, 31, None, main_stream.API_KEY))
+        await asyncio.sleep(0)
+        # 구독자가 프레임을 가져가기 전에 버퍼를 넘치게 발행
+        _publish(broadcaster, "a", "b", "c")
+        await asyncio.wait_for(task, timeout=1)
+        return websocket, broadcaster
+
+    websocket, broadcaster = asyncio.run(scenario())
+    assert websocket.accepted
+    assert websocket.close_code == 1013
+    assert broadcaster.subscribers == []
+
+
+def test_websocket_accepts_query_api_key_and_closes_normally(main_stream, monkeypatch):
+    async def scenario():
+        broadcaster = ChatBroadcaster(32)
+        _publish(broadcaster, "a")
+        broadcaster.close()
+        monkeypatch.setitem(main_stream.chat_broadcasters, 32, broadcaster)
+        rejected = FakeWebSocket()
+        await main_stream.stream_websocket(rejected, 32, None, "wrong-key")
+        websocket = FakeWebSocket()
+        await main_stream.stream_websocket(websocket, 32, None, main_stream.API_KEY)
+        return rejected, websocket
+
+    rejected, websocket = asyncio.run(scenario())
+    assert rejected.close_code == 1008 and not rejected.accepted
+    assert websocket.close_code == 1000
+    assert [json.loads(text)["data"] for text in websocket.sent] == ["a"]
+
+
+def test_sse_sends_ids_end_event_and_resumes(main_stream, monkeypatch):
+    async def read(last_event_id=None) -> str:
+        response = await main_stream.stream_sse(33, main_stream.API_KEY, last_event_id)
+        return "".join([chunk async for chunk in response.body_iterator])
+
+    async def scenario():
+        broadcaster = ChatBroadcaster(33)
+        _publish(broadcaster, "a", "b")
+        main_stream.publish_error(broadcaster, "응답 생성 중 오류가 발생했습니다.")
+        broadcaster.close()
+        monkeypatch.setitem(main_stream.chat_broadcasters, 33, broadcaster)
+        return await read(), await read("3"), await read("bogus")
+
+    first, resumed, invalid = asyncio.run(scenario())
+    assert first.startswith('id: 1\ndata: {"type": "TEXT", "data": "a"}\n\n')
+    assert first.endswith(SSE_END_EVENT)
+    # 오류 메시지는 글자 단위가 아니라 하나의 ERROR 프레임
+    error_frames = [line for line in first.split("\n") if '"ERROR"' in line]
+    assert error_frames == ['data: {"type":"ERROR","data":"응답 생성 중 오류가 발생했습니다."}']
+    assert resumed == SSE_END_EVENT
+    assert invalid == first
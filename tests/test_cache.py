@@ -0,0 +1,109 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from cache import CachedDatabase, LRUCache
+from maintenance import MaintenanceWorker
+from models import ChatRequest, ChatResponse
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.put(1, ["a"])
+    cache.put(2, ["b"])
+    assert cache.get(1) == ["a"]
+    cache.put(3, ["c"])
+
+    assert cache.get(2) is None
+    assert cache.get(1) == ["a"]
+    assert cache.get(3) == ["c"]
+    assert cache.stats() == {"size": 2, "hits": 3, "misses": 1, "evictions": 1}
+
+
+def test_lru_append_only_to_cached_entries():
+    cache = LRUCache()
+    assert cache.append(1, "a") is False
+    cache.put(1, [])
+    assert cache.append(1, "a") is True
+    assert cache.peek(1) == ["a"]
+    assert cache.stats()["hits"] == 0
+
+
+def test_lru_invalidate_and_clear():
+    cache = LRUCache()
+    cache.put(1, ["a"])
+    cache.put(2, ["b"])
+    cache.invalidate(1)
+    assert cache.get(1) is None
+    cache.clear()
+    assert cache.get(2) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_cached_responses_are_write_through(database):
+    cached = CachedDatabase(database)
+    cached.save_chat_request(ChatRequest(chatSn=1, businessNumber="123", content="hi"))
+    cached.save_chat_response(ChatResponse(chatSn=1, type="TEXT", content="a"))
+    cached.save_chat_response(ChatResponse(chatSn=1, type="TEXT", content="b"))
+
+    assert [row["content"] for row in cached.get_chat_responses(1)] == ["a", "b"]
+    assert cached.stats()["responses"]["hits"] == 1
+    assert cached.stats()["responses"]["misses"] == 0
+    assert [row["content"] for row in database.get_chat_responses(1)] == ["a", "b"]
+
+
+def test_cached_request_is_invalidated_on_save(database):
+    cached = CachedDatabase(database)
+    cached.save_chat_request(ChatRequest(chatSn=1, businessNumber="123", content="first"))
+    assert cached.get_chat_request(1)["content"] == "first"
+    cached.save_chat_request(ChatRequest(chatSn=1, businessNumber="123", content="second"))
+
+    assert cached.get_chat_request(1)["content"] == "second"
+    assert cached.stats()["requests"] == {"size": 1, "hits": 0, "misses": 2, "evictions": 0}
+
+
+class SlowReadDatabase:
+    """DB 조회와 캐시 저장 사이에 다른 스레드가 끼어들 틈을 넓힘"""
+
+    def __init__(self, database):
+        self._db = database
+
+    def __getattr__(self, name):
+        return getattr(self._db, name)
+
+    def get_chat_responses(self, chat_sn: int) -> list:
+        rows = self._db.get_chat_responses(chat_sn)
+        time.sleep(0.002)
+        return rows
+
+
+def test_concurrent_refill_and_save_keep_cache_consistent(database):
+    cached = CachedDatabase(SlowReadDatabase(database))
+
+    for i in range(20):
+        # 미스 적재 도중에 응답이 저장돼도 캐시에 중복/누락 없이 반영되어야 함
+        cached.responses.invalidate(1)
+        reader = threading.Thread(target=cached.get_chat_responses, args=(1,))
+        reader.start()
+        cached.save_chat_response(ChatResponse(chatSn=1, type="TEXT", content=str(i)))
+        reader.join()
+
+        assert [row["content"] for row in cached.get_chat_responses(1)] == [str(j) for j in range(i + 1)]
+
+
+def test_maintenance_clears_cache_only_on_expiry(database):
+    cached = CachedDatabase(database)
+    now = datetime(2026, 10, 19, 12, 0, 0)
+    data = database.build_chat_response_row(ChatResponse(chatSn=1, type="TEXT", content="old"))
+    data["created_at"] = (now - timedelta(days=30)).isoformat()
+    database.insert_chat_response(data)
+    cached.get_chat_responses(1)
+
+    worker = MaintenanceWorker(cached, ttl_days={"chat_request": 90, "chat_response": 365},
+                               archive_after_days=7, on_change=cached.clear)
+    assert worker.run_once(now)["archived_responses"] == 1
+    assert cached.stats()["responses"]["size"] == 1
+
+    assert worker.run_once(now + timedelta(days=400))["expired_segments"] == 1
+    assert cached.stats()["responses"]["size"] == 0
+    assert cached.get_chat_responses(1) == []
@@ -0,0 +1,113 @@
+import asyncio
+import gzip
+import json
+import zlib
+
+import pytest
+
+import compression
+from compression import CompressionMiddleware, negotiate_encoding, wants_msgpack
+
+
+def _app(start_headers, bodies):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": start_headers})
+        for i, body in enumerate(bodies):
+            await send({"type": "http.response.body", "body": body, "more_body": i < len(bodies) - 1})
+    return app
+
+
+def _call(app, accept_encoding="gzip", minimum_size=500):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "headers": [(b"accept-encoding", accept_encoding.encode())] if accept_encoding else []}
+    asyncio.run(CompressionMiddleware(app, minimum_size=minimum_size)(scope, receive, send))
+    headers = dict(messages[0]["headers"])
+    return headers, [message["body"] for message in messages[1:]]
+
+
+def test_small_body_is_passed_through():
+    headers, bodies = _call(_app([(b"content-type", b"application/json"), (b"content-length", b"2")], [b"{}"]))
+
+    assert b"content-encoding" not in headers
+    assert headers[b"content-length"] == b"2"
+    assert bodies == [b"{}"]
+
+
+def test_large_body_gets_recomputed_content_length():
+    payload = json.dumps([{"type": "TEXT", "data": "재무회계 담당자"}] * 100, ensure_ascii=False).encode()
+    headers, bodies = _call(_app([(b"content-type", b"application/json"),
+                                  (b"content-length", str(len(payload)).encode())], [payload]))
+
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"vary"] == b"Accept-Encoding"
+    assert int(headers[b"content-length"]) == len(bodies[0]) < len(payload)
+    assert gzip.decompress(bodies[0]) == payload
+
+
+def test_streamed_messages_are_flushed_one_by_one():
+    lines = [json.dumps({"type": "TEXT", "data": char}, ensure_ascii=False).encode() + b"\n" for char in "재무회계"]
+    headers, bodies = _call(_app([(b"content-type", b"application/x-ndjson")], lines))
+
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    # 각 메시지만으로 해당 NDJSON 줄이 바로 풀려야 함 (다음 청크를 기다리지 않음)
+    for line, body in zip(lines[:-1], bodies):
+        assert decompressor.decompress(body) == line
+    assert decompressor.decompress(bodies[-1]) + decompressor.flush() == lines[-1]
+
+
+def test_already_encoded_and_binary_responses_are_skipped():
+    payload = b"x" * 1000
+    headers, bodies = _call(_app([(b"content-type", b"image/png")], [payload]))
+    assert b"content-encoding" not in headers and bodies == [payload]
+
+    headers, bodies = _call(_app([(b"content-type", b"text/plain"), (b"content-encoding", b"br")], [payload]))
+    assert headers[b"content-encoding"] == b"br" and bodies == [payload]
+
+
+def test_no_accept_encoding_is_passed_through():
+    payload = b"x" * 1000
+    headers, bodies = _call(_app([(b"content-type", b"text/plain")], [payload]), accept_encoding=None)
+    assert b"content-encoding" not in headers and bodies == [payload]
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("gzip", "gzip"),
+    ("gzip;q=0", None),
+    ("identity", None),
+    ("identity, gzip;q=0.5", "gzip"),
+    ("*", compression.SUPPORTED_ENCODINGS[0]),
+    ("*, gzip;q=0", next((name for name in compression.SUPPORTED_ENCODINGS if name != "gzip"), None)),
+    ("deflate", None),
+    ("", None),
+])
+def test_negotiate_encoding(accept_encoding, expected):
+    assert negotiate_encoding(accept_encoding) == expected
+
+
+@pytest.mark.parametrize("accept, expected", [
+    ("application/x-msgpack", True),
+    ("application/x-ndjson", False),
+    ("application/x-msgpack, application/x-ndjson", True),
+    ("application/x-msgpack;q=0.5, application/x-ndjson", False),
+    ("application/x-ndjson;q=0.5, application/x-msgpack", True),
+    ("application/x-msgpack;q=0", False),
+    (None, False),
+])
+def test_wants_msgpack_preference(monkeypatch, accept, expected):
+    # 설치 여부와 무관하게 협상 로직만 확인
+    monkeypatch.setattr(compression, "msgpack", object())
+    assert wants_msgpack(accept) is expected
+
+
+def test_wants_msgpack_without_library(monkeypatch):
+    monkeypatch.setattr(compression, "msgpack", None)
+    assert wants_msgpack("application/x-msgpack") is False
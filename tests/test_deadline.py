@@ -0,0 +1,117 @@
+import asyncio
+import json
+import time
+
+import pytest
+from fastapi import FastAPI
+
+from deadline import DeadlineExceeded, DeadlineMiddleware, RequestContext, _current_context, check_deadline, \
+    deadline_exceeded_handler, deadline_metrics, deadline_stats, remaining, route_template, with_deadline
+
+
+def _call(app, path: str, headers=()):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": path, "raw_path": path.encode(), "query_string": b"",
+             "root_path": "", "scheme": "http", "http_version": "1.1", "server": ("test", 80),
+             "client": ("test", 1), "headers": [(key.encode(), value.encode()) for key, value in headers]}
+    asyncio.run(app(scope, receive, send))
+    return messages[0]["status"], json.loads(b"".join(message.get("body", b"") for message in messages[1:]))
+
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+    app.add_middleware(DeadlineMiddleware, default_seconds=5)
+    app.add_exception_handler(DeadlineExceeded, deadline_exceeded_handler)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"remaining": remaining()}
+
+    @app.get("/slow")
+    async def slow():
+        await with_deadline(asyncio.sleep(1), "work")
+        return {}
+
+    deadline_metrics["requests"].clear()
+    deadline_metrics["exceeded"].clear()
+    return app
+
+
+def test_route_template_groups_numeric_segments():
+    assert route_template("/api/stream/v1/chats/42/responses/stream") == "/api/stream/v1/chats/{id}/responses/stream"
+    assert route_template("/api/v1/chats/refine") == "/api/v1/chats/refine"
+
+
+def test_budget_uses_smaller_of_header_and_route_default():
+    middleware = DeadlineMiddleware(None, default_seconds=5)
+    assert middleware._budget("/unknown", []) == 5
+    assert middleware._budget("/unknown", [(b"X-Request-Deadline-Ms", b"1500")]) == 1.5
+    assert middleware._budget("/unknown", [(b"x-request-deadline-ms", b"60000")]) == 5
+    assert middleware._budget("/unknown", [(b"x-request-deadline-ms", b"soon")]) == 5
+    assert middleware._budget("/api/v1/chats/refine", []) == 10
+
+
+def test_request_context_carries_header_budget(app):
+    status, body = _call(app, "/items/1", headers=[("x-request-deadline-ms", "2000")])
+    assert status == 200
+    assert 1.5 < body["remaining"] <= 2.0
+
+
+def test_exceeded_deadline_returns_504_and_counts_stage(app):
+    status, body = _call(app, "/slow", headers=[("x-request-deadline-ms", "50")])
+
+    assert status == 504
+    assert body == {"detail": "Deadline exceeded at work"}
+    assert deadline_stats()["exceeded"] == {"/slow work": 1}
+
+
+def test_only_known_routes_are_counted(app):
+    _call(app, "/items/1")
+    _call(app, "/items/2")
+    status, _ = _call(app, "/wp-admin/setup.php")
+
+    assert status == 404
+    assert deadline_stats()["requests"] == {"/items/{id}": 2}
+
+
+def test_check_deadline_counts_per_stage():
+    deadline_metrics["exceeded"].clear()
+    token = _current_context.set(RequestContext(route="/r", deadline=time.monotonic() - 1))
+    try:
+        for stage in ("db", "db", "stream"):
+            with pytest.raises(DeadlineExceeded):
+                check_deadline(stage)
+    finally:
+        _current_context.reset(token)
+
+    assert deadline_stats()["exceeded"] == {"/r db": 2, "/r stream": 1}
+
+
+def test_with_deadline_closes_coroutine_when_already_expired():
+    sleep = asyncio.sleep(1)
+
+    async def scenario():
+        token = _current_context.set(RequestContext(route="/r", deadline=time.monotonic() - 1))
+        try:
+            await with_deadline(sleep, "generation")
+        finally:
+            _current_context.reset(token)
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(scenario())
+    # 닫힌 코루틴은 프레임이 없음 (닫지 않으면 GC 시점에 'never awaited' 경고)
+    assert sleep.cr_frame is None
+
+
+def test_without_context_there_is_no_deadline():
+    assert remaining() is None
+    assert remaining(3.0) == 3.0
+    check_deadline("db")
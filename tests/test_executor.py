@@ -0,0 +1,127 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+import executor
+from executor import CpuExecutor, attach_shared, register_warmup, share_bytes, worker_state
+
+
+# 워커 프로세스에서 실행되는 함수는 pickle 가능하도록 모듈 수준에 둠
+def _checksum_shared(handle) -> int:
+    with attach_shared(handle) as view:
+        return sum(view)
+
+
+def _warm_up():
+    worker_state["warmups"] = worker_state.get("warmups", 0) + 1
+    worker_state["index"] = {"재무": 1, "회계": 2}
+
+
+def _read_state() -> tuple:
+    return worker_state.get("warmups"), worker_state.get("index")
+
+
+def _hang() -> None:
+    time.sleep(60)
+
+
+def _pid() -> int:
+    return os.getpid()
+
+
+@pytest.fixture
+def warmup_hooks(monkeypatch):
+    # 등록한 warmup 함수가 다른 테스트의 풀로 새지 않도록 목록을 교체
+    monkeypatch.setattr(executor, "_warmup_hooks", [])
+    return executor._warmup_hooks
+
+
+@pytest.fixture
+def process_pool(warmup_hooks):
+    pools = []
+
+    def start(max_workers: int = 1, **kwargs) -> CpuExecutor:
+        pool = CpuExecutor(max_workers=max_workers, **{"timeout": 30, **kwargs})
+        pool.start()
+        pools.append(pool)
+        return pool
+
+    yield start
+    for pool in pools:
+        pool.shutdown()
+
+
+def test_share_bytes_passes_buffer_to_worker(process_pool):
+    data = os.urandom(1 << 20)
+    pool = process_pool()
+
+    with share_bytes(data) as handle:
+        assert handle[1] == len(data)
+        assert asyncio.run(pool.run(_checksum_shared, handle)) == sum(data)
+
+
+def test_share_bytes_without_pool_runs_in_thread():
+    data = bytearray(range(256)) * 4
+    with share_bytes(data) as handle:
+        assert asyncio.run(CpuExecutor().run(_checksum_shared, handle)) == sum(data)
+
+
+def test_share_bytes_releases_segment():
+    from multiprocessing import shared_memory
+
+    with share_bytes(b"solver") as (name, size):
+        assert size == 6
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
+
+
+def test_registered_warmup_runs_once_in_each_worker(warmup_hooks, process_pool):
+    assert register_warmup(_warm_up) is _warm_up
+    assert warmup_hooks == [_warm_up]
+    pool = process_pool(max_workers=2)
+
+    async def run_many():
+        return await asyncio.gather(*[pool.run(_read_state) for _ in range(6)])
+
+    for warmups, index in asyncio.run(run_many()):
+        assert warmups == 1
+        assert index == {"재무": 1, "회계": 2}
+    # warmup 은 워커에서만 실행되고 부모 프로세스 상태는 그대로
+    assert "warmups" not in worker_state
+
+
+def test_stuck_task_recycles_worker_pool(process_pool):
+    pool = process_pool(timeout=0.2, stuck_grace=0.1)
+    old_pool = pool._pool
+    old_processes = list(old_pool._processes.values())
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.run(_hang)
+        # stuck_grace 가 지나면 새 풀로 교체되고, 다음 작업은 새 워커에서 실행됨
+        await asyncio.sleep(0.3)
+        return await pool.run(_pid, timeout=10)
+
+    pid = asyncio.run(scenario())
+    assert pool.recycled == 1
+    assert pool._pool is not old_pool
+    assert pid not in {process.pid for process in old_processes}
+    for process in old_processes:
+        process.join(timeout=5)
+        assert not process.is_alive()
+
+
+def test_finished_task_after_timeout_keeps_pool(process_pool):
+    pool = process_pool(timeout=0.1, stuck_grace=1.0)
+    old_pool = pool._pool
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.run(time.sleep, 0.3)
+        await asyncio.sleep(1.2)
+
+    asyncio.run(scenario())
+    assert pool.recycled == 0
+    assert pool._pool is old_pool
@@ -0,0 +1,97 @@
+import asyncio
+import json
+
+import pytest
+
+import main_json
+from deadline import deadline_metrics
+from main_json import ChatFilterType, get_next_filter, stream_next_filters
+from models import JobDescriptionServiceDto
+
+JOB_DESCRIPTION = JobDescriptionServiceDto(
+    sn=1, title="백엔드 개발자", descriptions=["API 개발"], requiredSkills=["Python"], preferredSkills=[]
+)
+
+
+def _delayed(producer, seconds: float):
+    async def produce(jobDescription):
+        await asyncio.sleep(seconds)
+        return await producer(jobDescription)
+    return produce
+
+
+async def _failing(jobDescription):
+    raise RuntimeError("upstream error")
+
+
+@pytest.fixture
+def producers(monkeypatch):
+    def patch(**overrides):
+        for name, producer in overrides.items():
+            monkeypatch.setitem(main_json.FILTER_PRODUCERS, ChatFilterType[name], producer)
+    return patch
+
+
+def _exceeded(stage: str = "filter") -> int:
+    return sum(count for (_, recorded), count in deadline_metrics["exceeded"].items() if recorded == stage)
+
+
+async def _collect(deadline: float):
+    return [json.loads(line) for line in [event async for event in stream_next_filters(JOB_DESCRIPTION, deadline)]]
+
+
+def test_all_filters_in_declared_order():
+    result = asyncio.run(get_next_filter(1, JOB_DESCRIPTION, "123", deadline=1.0))
+
+    assert [item.type for item in result.filters] == list(main_json.FILTER_PRODUCERS)
+    assert result.isPartial is False
+    assert result.missingTypes == []
+
+
+def test_slow_and_failing_producers_are_reported_missing(producers):
+    producers(CAREER=_delayed(main_json.produce_career_filter, 5), LICENSE=_failing)
+    before = _exceeded()
+
+    result = asyncio.run(get_next_filter(1, JOB_DESCRIPTION, "123", deadline=0.1))
+
+    assert result.isPartial is True
+    assert result.missingTypes == [ChatFilterType.LICENSE, ChatFilterType.CAREER]
+    assert ChatFilterType.SKILL in [item.type for item in result.filters]
+    assert _exceeded() == before + 1
+
+
+def test_failing_producer_alone_is_not_a_deadline_hit(producers):
+    producers(LICENSE=_failing)
+    before = _exceeded()
+
+    result = asyncio.run(get_next_filter(1, JOB_DESCRIPTION, "123", deadline=1.0))
+
+    assert result.missingTypes == [ChatFilterType.LICENSE]
+    assert _exceeded() == before
+
+
+def test_stream_emits_filters_in_completion_order_then_end(producers):
+    producers(SKILL=_delayed(main_json.produce_skill_filter, 0.05),
+              EDUCATION=_delayed(main_json.produce_education_filter, 0.03),
+              CAREER=_delayed(main_json.produce_career_filter, 5),
+              LICENSE=_failing)
+
+    events = asyncio.run(_collect(deadline=0.2))
+
+    assert [event["event"] for event in events] == ["FILTER"] * 3 + ["END"]
+    assert [event["filter"]["type"] for event in events[:3]] == ["EXAMINATION", "EDUCATION", "SKILL"]
+    assert events[-1]["isPartial"] is True
+    assert events[-1]["missingTypes"] == ["LICENSE", "CAREER"]
+
+
+def test_stream_disconnect_is_not_a_deadline_hit(producers):
+    producers(CAREER=_delayed(main_json.produce_career_filter, 5))
+    before = _exceeded()
+
+    async def disconnect_after_first_event():
+        stream = stream_next_filters(JOB_DESCRIPTION, deadline=10)
+        await stream.__anext__()
+        await stream.aclose()
+
+    asyncio.run(disconnect_after_first_event())
+    assert _exceeded() == before
@@ -0,0 +1,99 @@
+import json
+
+import pytest
+
+import job_groups
+from job_groups import DEFAULT_JOB_GROUP_CODE, JobGroupCatalog, classify_job_description
+from models import JobDescriptionServiceDto, JobDto
+
+JOBS = [
+    JobDto(jobGroupCode=1, jobGroupName="재무/회계", jobDefinition="자금 관리, 재무제표 작성, 세무 신고와 결산을 담당"),
+    JobDto(jobGroupCode=2, jobGroupName="백엔드 개발", jobDefinition="서버 API 설계와 데이터베이스 운영, 파이썬/자바 개발"),
+    JobDto(jobGroupCode=3, jobGroupName="인사", jobDefinition="채용, 평가, 보상 제도 운영과 교육 기획"),
+]
+
+FINANCE_JD = JobDescriptionServiceDto(
+    sn=1, title="재경본부 신입", descriptions=["자금 조달 및 지출 관리", "재무제표 작성 및 분석 지원"],
+    requiredSkills=["회계 및 세무 관련 경력"], preferredSkills=["CPA 자격증"]
+)
+BACKEND_JD = JobDescriptionServiceDto(
+    sn=2, title="서버 개발자", descriptions=["API 설계 및 개발"], requiredSkills=["파이썬"], preferredSkills=["데이터베이스 운영"]
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_request_caches():
+    job_groups._request_entries.clear()
+    job_groups._scoped_catalogs.clear()
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    path = tmp_path / "job_groups.json"
+    path.write_text(json.dumps([job.model_dump() for job in JOBS], ensure_ascii=False), encoding="utf-8")
+    shared = JobGroupCatalog()
+    shared.load_file(str(path))
+    monkeypatch.setattr(job_groups, "job_group_catalog", shared)
+    return shared
+
+
+def test_classify_picks_closest_job_group(catalog):
+    assert catalog.codes() == {1, 2, 3}
+    assert catalog.classify(FINANCE_JD) == 1
+    assert catalog.classify(BACKEND_JD) == 2
+    assert catalog.classify(BACKEND_JD, candidates={1, 3}) in {1, 3}
+
+
+def test_classify_with_codes_only_uses_shared_catalog(catalog):
+    assert classify_job_description(FINANCE_JD, [1, 2], []) == 1
+    assert classify_job_description(BACKEND_JD, [], []) == 2
+
+
+def test_request_definitions_do_not_change_shared_catalog(catalog):
+    renamed = JobDto(jobGroupCode=3, jobGroupName="서버 개발", jobDefinition="API 서버 개발과 데이터베이스 운영")
+    new_group = JobDto(jobGroupCode=9, jobGroupName="재무 분석", jobDefinition="재무제표 분석과 자금 계획")
+
+    assert classify_job_description(BACKEND_JD, [1], [renamed]) == 3
+    assert classify_job_description(FINANCE_JD, [], [new_group, JOBS[1]]) == 9
+    assert catalog.codes() == {1, 2, 3}
+    assert catalog.entries[3].name == "인사"
+
+
+def test_scoped_catalog_reuses_matching_entries(catalog):
+    scoped = catalog.scoped([1], [JOBS[1]])
+    assert scoped.codes() == {1, 2}
+    assert scoped.entries[2] is catalog.entries[2]
+
+
+def test_missing_catalog_file_leaves_catalog_empty(tmp_path):
+    catalog = JobGroupCatalog()
+    catalog.load_file(str(tmp_path / "missing.json"))
+    assert catalog.codes() == set()
+    assert catalog.classify(FINANCE_JD) is None
+
+
+def test_scoped_catalog_is_cached_per_definitions(catalog, monkeypatch):
+    renamed = JobDto(jobGroupCode=3, jobGroupName="서버 개발", jobDefinition="API 서버 개발과 데이터베이스 운영")
+    built = []
+    monkeypatch.setattr(job_groups.JobGroupCatalog, "_build_index",
+                        lambda self, build=JobGroupCatalog._build_index: built.append(1) or build(self))
+
+    first = catalog.scoped([1], [renamed])
+    assert catalog.scoped([1], [renamed]) is first
+    assert len(built) == 1
+
+    changed = renamed.model_copy(update={"jobDefinition": "API 서버 개발"})
+    second = catalog.scoped([1], [changed])
+    assert second is not first
+    assert second.entries[3].definition == "API 서버 개발"
+    assert catalog.entries[3].name == "인사"
+
+
+def test_unmatched_description_falls_back_to_candidate(catalog):
+    unrelated = JobDescriptionServiceDto(sn=3, title="zzz", descriptions=[], requiredSkills=[], preferredSkills=[])
+    new_group = JobDto(jobGroupCode=9, jobGroupName="재무 분석", jobDefinition="재무제표 분석과 자금 계획")
+
+    assert classify_job_description(unrelated, [2, 3], []) == 2
+    assert classify_job_description(unrelated, [], [new_group]) == 9
+    assert classify_job_description(unrelated, [DEFAULT_JOB_GROUP_CODE, 3], []) == DEFAULT_JOB_GROUP_CODE
+    assert classify_job_description(unrelated, [], []) == DEFAULT_JOB_GROUP_CODE
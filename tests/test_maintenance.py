@@ -0,0 +1,87 @@
+import os
+from datetime import datetime, timedelta
+
+from maintenance import ChatArchive, MaintenanceWorker
+from models import ChatResponse
+
+
+def _row(chat_sn: int, created_at: str, content: str) -> dict:
+    return {"chatSn": chat_sn, "type": "TEXT", "content": content, "created_at": created_at}
+
+
+def test_archive_get_reads_only_rows_of_chat(tmp_path):
+    archive = ChatArchive(str(tmp_path))
+    archive.append([_row(1, "2026-01-01T10:00:00", "a"), _row(2, "2026-01-01T10:00:01", "b"),
+                    _row(1, "2026-01-02T10:00:00", "c")])
+    archive.append([_row(1, "2026-01-01T11:00:00", "d")])
+
+    assert [row["content"] for row in archive.get(1)] == ["a", "d", "c"]
+    assert [row["content"] for row in archive.get(2)] == ["b"]
+    assert archive.get(3) == []
+
+
+def test_archive_index_survives_reload(tmp_path):
+    ChatArchive(str(tmp_path)).append([_row(7, "2026-01-01T10:00:00", "a")])
+
+    assert [row["content"] for row in ChatArchive(str(tmp_path)).get(7)] == ["a"]
+
+
+def test_archive_compact_merges_members_per_chat(tmp_path):
+    archive = ChatArchive(str(tmp_path))
+    archive.append([_row(1, "2026-01-01T10:00:00", "a"), _row(2, "2026-01-01T10:00:00", "b")])
+    archive.append([_row(1, "2026-01-01T11:00:00", "c")])
+    archive.append([_row(3, "2026-01-02T10:00:00", "d")])
+
+    assert archive.compact() == 1
+    assert archive.compact() == 0
+    assert [row["content"] for row in archive.get(1)] == ["a", "c"]
+    assert [row["content"] for row in archive.get(2)] == ["b"]
+    assert [row["content"] for row in archive.get(3)] == ["d"]
+    assert not os.path.exists(os.path.join(str(tmp_path), "2026-01-01.ndjson.gz.tmp"))
+
+
+def test_archive_get_keeps_reading_while_compact_replaces_segment(tmp_path):
+    archive = ChatArchive(str(tmp_path))
+    archive.append([_row(1, "2026-01-01T10:00:00", "a")])
+    archive.append([_row(1, "2026-01-01T11:00:00", "b")])
+    handle = open(os.path.join(str(tmp_path), "2026-01-01.ndjson.gz"), "rb")
+    locations = archive._load_index()["chats"]["1"]
+
+    archive.compact()
+    with handle:
+        assert [row["content"] for row in archive._read_members(handle, locations)] == ["a", "b"]
+
+
+def test_archive_expire_removes_old_segments(tmp_path):
+    archive = ChatArchive(str(tmp_path))
+    archive.append([_row(1, "2026-01-01T10:00:00", "a"), _row(1, "2026-01-03T10:00:00", "b"),
+                    _row(2, "2026-01-01T10:00:00", "c")])
+
+    assert archive.expire("2026-01-02") == 1
+    assert archive.expire("2026-01-02") == 0
+    assert [row["content"] for row in archive.get(1)] == ["b"]
+    assert archive.get(2) == []
+    assert not os.path.exists(os.path.join(str(tmp_path), "2026-01-01.ndjson.gz"))
+
+
+def test_maintenance_cycle_archives_expires_and_compacts(database):
+    now = datetime(2026, 10, 19, 12, 0, 0)
+    for days, content in ((400, "expired"), (30, "archived"), (10, "archived-later"), (1, "recent")):
+        data = database.build_chat_response_row(ChatResponse(chatSn=1, type="TEXT", content=content))
+        data["created_at"] = (now - timedelta(days=days)).isoformat()
+        database.insert_chat_response(data)
+
+    worker = MaintenanceWorker(database, ttl_days={"chat_request": 90, "chat_response": 365}, archive_after_days=7)
+    stats = worker.run_once(now)
+
+    assert stats["expired_responses"] == 1
+    assert stats["archived_responses"] == 2
+    assert [row["content"] for row in database.chat_response.all()] == ["recent"]
+    assert [row["content"] for row in database.get_chat_responses(1)] == ["archived", "archived-later", "recent"]
+
+    # 보관 기간이 지난 아카이브 세그먼트는 만료되고, 남은 응답도 아카이브로 이동
+    stats = worker.run_once(now + timedelta(days=340))
+    assert stats["expired_segments"] == 1
+    assert stats["archived_responses"] == 1
+    assert database.chat_response.all() == []
+    assert [row["content"] for row in database.get_chat_responses(1)] == ["archived-later", "recent"]
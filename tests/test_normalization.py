@@ -0,0 +1,19 @@
+import unicodedata
+
+from normalization import normalize_text, normalize_texts
+
+
+def test_normalize_text_cleans_noise():
+    text = "재무\u200b회계\u3000\u3000담당자 \n 모집\U0001F600\r"
+    assert normalize_text(text) == "재무회계 담당자\n모집"
+
+
+def test_normalize_text_composes_nfd_hangul():
+    assert normalize_text(unicodedata.normalize("NFD", "재경본부")) == "재경본부"
+
+
+def test_normalize_texts_matches_per_item_results():
+    texts = ["  재무  회계 ", "\x00구분자\x00", unicodedata.normalize("NFD", "한글 자모"), "", "탭\t\t개행\u2028 끝",
+             "\ufeff이모지\U0001F600"]
+    assert normalize_texts(texts) == [normalize_text(text) for text in texts]
+    assert normalize_texts([]) == []
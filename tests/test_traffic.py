@@ -0,0 +1,122 @@
+import asyncio
+import json
+import re
+
+import pytest
+
+import replay
+import traffic
+from traffic import TrafficRecorder, TrafficRecorderMiddleware, anonymize, is_sampled, load_records
+
+
+class ListRecorder:
+    def __init__(self):
+        self.records = []
+
+    def record(self, record):
+        self.records.append(record)
+
+
+async def _echo_app(scope, receive, send):
+    while (await receive()).get("more_body"):
+        pass
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+def _call(middleware, path, body, method="POST"):
+    chunks = [body[i:i + 4] for i in range(0, len(body), 4)] or [b""]
+    messages = [{"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1} for i, chunk in enumerate(chunks)]
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": method, "path": path, "query_string": b"",
+             "headers": [(b"content-type", b"application/json"), (b"x-api-key", b"secret")]}
+    asyncio.run(middleware(scope, receive, send))
+
+
+def test_anonymize_replaces_business_number_everywhere():
+    payload = {"businessNumber": "123-45-67890", "chatSn": 1,
+               "items": [{"businessNumber": "123-45-67890"}, {"businessNumber": "999"}]}
+
+    result = anonymize(payload)
+
+    assert result["chatSn"] == 1
+    assert result["businessNumber"].startswith("anon-")
+    assert "123-45-67890" not in json.dumps(result)
+    assert result["items"][0]["businessNumber"] == result["businessNumber"]
+    assert result["items"][1]["businessNumber"] != result["businessNumber"]
+    assert payload["businessNumber"] == "123-45-67890"
+
+
+def test_middleware_records_anonymized_request_without_secret_headers():
+    recorder = ListRecorder()
+    middleware = TrafficRecorderMiddleware(_echo_app, sample_rate=1, recorder=recorder)
+
+    _call(middleware, "/api/v1/chats", json.dumps({"chatSn": 1, "businessNumber": "123"}).encode())
+
+    [record] = recorder.records
+    assert record["m"] == "POST" and record["p"] == "/api/v1/chats" and record["s"] == 200
+    assert record["b"]["businessNumber"].startswith("anon-")
+    assert record["h"] == {"content-type": "application/json"}
+
+
+def test_middleware_skips_oversized_body(monkeypatch):
+    monkeypatch.setattr(traffic, "TRAFFIC_MAX_BODY_BYTES", 8)
+    recorder = ListRecorder()
+    middleware = TrafficRecorderMiddleware(_echo_app, sample_rate=1, recorder=recorder)
+
+    _call(middleware, "/api/v1/chats", json.dumps({"chatSn": 1, "text": "x" * 20}).encode())
+    _call(middleware, "/api/v1/chats", b'{"a":1}')
+
+    assert [record["b"] for record in recorder.records] == [{"a": 1}]
+
+
+def test_middleware_skips_non_json_body():
+    recorder = ListRecorder()
+    middleware = TrafficRecorderMiddleware(_echo_app, sample_rate=1, recorder=recorder)
+
+    _call(middleware, "/api/v1/chats", b"not json")
+
+    assert recorder.records == []
+
+
+def test_chat_post_and_stream_get_are_sampled_together():
+    recorder = ListRecorder()
+    middleware = TrafficRecorderMiddleware(_echo_app, sample_rate=0.5, recorder=recorder)
+
+    for chat_sn in range(200):
+        _call(middleware, "/api/stream/v1/chats", json.dumps({"chatSn": chat_sn}).encode())
+        _call(middleware, f"/api/stream/v1/chats/{chat_sn}/responses/stream", b"", method="GET")
+
+    posted = {record["b"]["chatSn"] for record in recorder.records if record["m"] == "POST"}
+    streamed = {int(record["p"].split("/")[5]) for record in recorder.records if record["m"] == "GET"}
+    assert posted == streamed
+    assert 0 < len(posted) < 200
+    assert posted == {chat_sn for chat_sn in range(200) if is_sampled(chat_sn, 0.5)}
+
+
+def test_recorder_flush_writes_loadable_log(tmp_path):
+    recorder = TrafficRecorder(str(tmp_path), flush_records=2)
+
+    recorder.record({"t": 2, "p": "/b"})
+    recorder.record({"t": 1, "p": "/a"})
+    recorder.record({"t": 3, "p": "/c"})
+    recorder.flush().result()
+
+    assert [record["p"] for record in load_records([str(path) for path in tmp_path.iterdir()])] == ["/a", "/b", "/c"]
+
+
+def test_replay_keeps_only_served_routes():
+    routes = [("GET", re.compile(r"^/api/stream/v1/chats/[^/]+/responses/stream$")),
+              ("POST", re.compile(r"^/api/stream/v1/chats$"))]
+    records = [{"m": "POST", "p": "/api/stream/v1/chats"},
+               {"m": "GET", "p": "/api/stream/v1/chats/3/responses/stream"},
+               {"m": "POST", "p": "/api/v1/chats/job-descriptions/filter"},
+               {"m": "POST", "p": "/api/stream/v1/chats/3/responses/stream"}]
+
+    assert replay.filter_served(records, routes) == records[:2]
@@ -0,0 +1,195 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import secrets
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 기록할 요청 비율 (0 이면 기록하지 않음)
+TRAFFIC_SAMPLE_RATE = float(os.getenv("TRAFFIC_SAMPLE_RATE", 0))
+TRAFFIC_LOG_DIR = os.getenv("TRAFFIC_LOG_DIR", "traffic")
+# 익명화 솔트. 지정하지 않으면 프로세스마다 임의로 만들어서 원래 값을 사전 대입으로 되찾을 수 없게 함
+# (이 경우 프로세스/재시작 간에는 같은 값이 다른 익명 값이 됨)
+TRAFFIC_ANONYMIZE_SALT = os.getenv("TRAFFIC_ANONYMIZE_SALT") or secrets.token_hex(16)
+# 이보다 큰 요청 본문은 기록하지 않음
+TRAFFIC_MAX_BODY_BYTES = int(os.getenv("TRAFFIC_MAX_BODY_BYTES", 1024 * 1024))
+TRAFFIC_FLUSH_RECORDS = int(os.getenv("TRAFFIC_FLUSH_RECORDS", 100))
+
+ANONYMIZED_KEYS = {"businessNumber"}
+# API 키 등 민감한 헤더는 제외하고 재생에 필요한 헤더만 기록
+RECORDED_HEADERS = {b"accept", b"accept-encoding", b"content-type", b"x-request-deadline-ms"}
+
+
+def anonymize(value):
+    """businessNumber 값을 솔트를 섞은 해시로 치환 (같은 값은 같은 익명 값이 됨)"""
+    if isinstance(value, dict):
+        return {
+            key: _anonymize_value(item) if key in ANONYMIZED_KEYS else anonymize(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [anonymize(item) for item in value]
+    return value
+
+
+def _anonymize_value(value) -> str:
+    digest = hashlib.sha256(f"{TRAFFIC_ANONYMIZE_SALT}{value}".encode("utf-8")).hexdigest()
+    return f"anon-{digest[:12]}"
+
+
+# 경로에 chatSn 이 들어 있는 요청 (/chats/{chatSn}/responses/stream 등)
+_CHAT_SN_PATH = re.compile(r"/chats/(\d+)(?=/|$)")
+
+
+def is_sampled(chat_sn, sample_rate: float) -> bool:
+    """chatSn 이 있으면 해시로 결정해서 한 채팅의 요청(생성 POST, 스트림 GET 등)이 함께 기록되거나 함께 빠지게 함
+
+    프로세스마다 같은 결과가 나와야 하므로 솔트를 섞지 않는다. chatSn 이 없으면 요청마다 무작위로 결정
+    """
+    if sample_rate >= 1:
+        return True
+    if chat_sn is None:
+        return random.random() < sample_rate
+    digest = hashlib.sha256(f"chatSn:{chat_sn}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") / 2 ** 64 < sample_rate
+
+
+def _chat_sn_from_path(path: str):
+    match = _CHAT_SN_PATH.search(path)
+    return int(match.group(1)) if match else None
+
+
+class TrafficRecorder:
+    """샘플링한 요청을 날짜별 gzip NDJSON 파일(YYYY-MM-DD.ndjson.gz)에 모아서 기록
+
+    압축과 파일 쓰기는 이벤트 루프를 막지 않도록 전용 스레드 하나에서 순서대로 실행한다.
+    """
+
+    def __init__(self, log_dir: str = TRAFFIC_LOG_DIR, flush_records: int = TRAFFIC_FLUSH_RECORDS):
+        self.log_dir = log_dir
+        self.flush_records = flush_records
+        self._records: List[dict] = []
+        self._lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="traffic-writer")
+
+    def record(self, record: dict):
+        with self._lock:
+            self._records.append(record)
+            if len(self._records) < self.flush_records:
+                return
+            records, self._records = self._records, []
+        self._writer.submit(self._write, records)
+
+    def flush(self) -> Future:
+        """남은 기록을 쓰기 대기열에 넣음. 반환된 Future 가 끝나면 이전 기록까지 모두 파일에 반영됨"""
+        with self._lock:
+            records, self._records = self._records, []
+        return self._writer.submit(self._write, records)
+
+    def _write(self, records: List[dict]):
+        if not records:
+            return
+        try:
+            os.makedirs(self.log_dir, exist_ok=True)
+            path = os.path.join(self.log_dir, f"{datetime.now().date().isoformat()}.ndjson.gz")
+            payload = "".join(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n" for record in records)
+            with open(path, "ab") as f:
+                f.write(gzip.compress(payload.encode("utf-8")))
+        except Exception as e:
+            logger.error(f"Error writing traffic log: {str(e)}", exc_info=True)
+
+
+traffic_recorder = TrafficRecorder()
+
+
+def load_records(paths: List[str]) -> List[dict]:
+    records = []
+    for path in paths:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    records.sort(key=lambda record: record["t"])
+    return records
+
+
+class TrafficRecorderMiddleware:
+    """요청을 샘플링해서 재생용 로그로 남기는 ASGI 미들웨어
+
+    기록 필드: t(시각), m(메서드), p(경로), q(쿼리), h(헤더), b(본문), s(상태 코드), d(처리 시간 ms)
+    경로에 chatSn 이 없으면 본문의 chatSn 으로 샘플링 여부를 정하므로 본문을 다 읽은 뒤에 결정한다.
+    """
+
+    def __init__(self, app, sample_rate: float = TRAFFIC_SAMPLE_RATE, recorder: Optional[TrafficRecorder] = None):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.recorder = recorder or traffic_recorder
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.sample_rate <= 0:
+            await self.app(scope, receive, send)
+            return
+        path_chat_sn = _chat_sn_from_path(scope["path"])
+        if path_chat_sn is not None and not is_sampled(path_chat_sn, self.sample_rate):
+            await self.app(scope, receive, send)
+            return
+
+        chunks = []
+        size = 0
+        status = None
+        started = time.time()
+
+        async def receive_wrapper():
+            nonlocal size
+            message = await receive()
+            if message["type"] == "http.request":
+                size += len(message.get("body", b""))
+                if size <= TRAFFIC_MAX_BODY_BYTES:
+                    chunks.append(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            self._record(scope, started, b"".join(chunks) if size <= TRAFFIC_MAX_BODY_BYTES else None, status)
+
+    def _record(self, scope, started: float, body: Optional[bytes], status: Optional[int]):
+        if body is None:
+            return
+        try:
+            payload = json.loads(body) if body else None
+        except ValueError:
+            return
+        chat_sn = _chat_sn_from_path(scope["path"])
+        if chat_sn is None and isinstance(payload, dict):
+            chat_sn = payload.get("chatSn")
+        if not is_sampled(chat_sn, self.sample_rate):
+            return
+        payload = anonymize(payload)
+        try:
+            self.recorder.record({
+                "t": round(started, 3),
+                "m": scope["method"],
+                "p": scope["path"],
+                "q": scope.get("query_string", b"").decode("latin-1"),
+                "h": {key.decode("latin-1"): value.decode("latin-1")
+                      for key, value in scope.get("headers", []) if key.lower() in RECORDED_HEADERS},
+                "b": payload,
+                "s": status,
+                "d": round((time.time() - started) * 1000, 1),
+            })
+        except Exception as e:
+            logger.error(f"Error recording traffic: {str(e)}", exc_info=True)